@@ -4,7 +4,7 @@ import json
 import wikipedia
 from dotenv import load_dotenv 
 from openai import OpenAI 
-from external_media_downloader import download_sign_media 
+from media_acquisition import acquire_missing_media
 from grammar_convert import convert_to_asl_grammar
 
 
@@ -59,6 +59,39 @@ def generate_gpt_summary(word):
         print(f"Error calling GPT API for '{word}': {e}")
         return None
 
+def resolve_media_urls(words):
+    """
+    Maps gloss words to /media URLs. All words without a local clip are scraped and
+    downloaded concurrently in one batch instead of one blocking download per word.
+    """
+    try:
+        with open("word_to_media.json", "r") as f:
+            word_map = json.load(f)
+    except:
+        word_map = {}
+
+    media_files = [word_map.get(word, f"{word}.mp4") for word in words]
+    missing = [
+        word for word, media_file in zip(words, media_files)
+        if not os.path.exists(os.path.join(MEDIA_FOLDER, media_file))
+    ]
+
+    downloaded = {}
+    if missing:
+        print(f"--- Missing sign videos for: {', '.join(dict.fromkeys(missing))}. Attempting external search and cache. ---")
+        # AUTOMATIC CACHING LOGIC
+        downloaded = acquire_missing_media(missing)
+
+    video_urls = []
+    for word, media_file in zip(words, media_files):
+        if word in downloaded:
+            if not downloaded[word]:
+                print(f"Skipping sign: {word} (No local file or external source found)")
+                continue
+            media_file = os.path.basename(downloaded[word])
+        video_urls.append(f"/media/{media_file}")
+    return video_urls
+
 # --- 3. ROUTES ---
 
 @app.route("/")
@@ -72,32 +105,7 @@ def convert_text():
         return jsonify({"error": "No input provided."})
 
     asl_text = convert_to_asl_grammar(text)
-    words = asl_text.split()
-    video_urls = []
-
-    try:
-        with open("word_to_media.json", "r") as f:
-            word_map = json.load(f)
-    except:
-        word_map = {}
-
-    for word in words:
-        media_file = word_map.get(word, f"{word}.mp4")
-        media_path = os.path.join(MEDIA_FOLDER, media_file)
-
-        if not os.path.exists(media_path):
-            print(f"--- Missing sign video for: {word}. Attempting external search and cache. ---")
-            
-            # AUTOMATIC CACHING LOGIC
-            downloaded_path = download_sign_media(word) 
-            
-            if downloaded_path:
-                media_file = os.path.basename(downloaded_path)
-            else:
-                print(f"Skipping sign: {word} (No local file or external source found)")
-                continue 
-
-        video_urls.append(f"/media/{media_file}")
+    video_urls = resolve_media_urls(asl_text.split())
 
     return jsonify({
         "asl_gloss": asl_text,
@@ -159,29 +167,7 @@ def search_convert():
         words = asl_text.split()
         
     # Find signs for the words in the resulting summary/ASL text and CACHE MISSING ONES
-    media_paths = []
-    try:
-        with open("word_to_media.json", "r") as f:
-            word_map = json.load(f)
-    except:
-        word_map = {}
-
-    for word in words:
-        media_file = word_map.get(word, f"{word}.mp4")
-        media_path = os.path.join(MEDIA_FOLDER, media_file)
-        
-        # CORE CACHING LOGIC
-        if not os.path.exists(media_path):
-            print(f"--- Missing sign video for: {word}. Attempting external search and cache. ---")
-            
-            downloaded_path = download_sign_media(word) 
-            
-            if downloaded_path:
-                media_file = os.path.basename(downloaded_path)
-            else:
-                continue 
-        
-        media_paths.append(f"/media/{media_file}")
+    media_paths = resolve_media_urls(words)
 
     return jsonify({
         "asl_gloss": asl_text,
@@ -16,6 +16,32 @@ HEADERS = {
 }
 # -----------------------------------------------
 
+def parse_video_url(html, base_url=BASE_SIGN_DICTIONARY_URL):
+    """Extracts the absolute sign video URL from an ISL Portal word page, or None."""
+    soup = BeautifulSoup(html, 'html.parser')
+    
+    # Logic to find the video source
+    video_tag = soup.find('video')
+    
+    if video_tag and video_tag.has_attr('src'):
+        video_src = video_tag['src']
+    else:
+        # Search for a <source> element within a video container
+        video_source_tag = soup.find('source', type=re.compile("video/"))
+        if video_source_tag and video_source_tag.has_attr('src'):
+            video_src = video_source_tag['src']
+        else:
+             return None 
+
+    # Ensure the URL is absolute
+    if video_src.startswith('http'):
+        return video_src
+    elif video_src.startswith('/'):
+        return base_url + video_src
+    
+    return None
+
+
 def scrape_sign_video_url(word):
     """
     Searches the ISL Portal for a word and attempts to find the direct video URL.
@@ -31,28 +57,7 @@ def scrape_sign_video_url(word):
         response = requests.get(search_url, headers=HEADERS, timeout=10)
         response.raise_for_status() # Raises the 403 Forbidden error if blocked
         
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Logic to find the video source
-        video_tag = soup.find('video')
-        
-        if video_tag and video_tag.has_attr('src'):
-            video_src = video_tag['src']
-        else:
-            # Search for a <source> element within a video container
-            video_source_tag = soup.find('source', type=re.compile("video/"))
-            if video_source_tag and video_source_tag.has_attr('src'):
-                video_src = video_source_tag['src']
-            else:
-                 return None 
-
-        # Ensure the URL is absolute
-        if video_src.startswith('http'):
-            return video_src
-        elif video_src.startswith('/'):
-            return BASE_SIGN_DICTIONARY_URL + video_src
-        
-        return None
+        return parse_video_url(response.content)
         
     except requests.exceptions.RequestException as e:
         # This catches 403 errors and network errors (like DNS failure)
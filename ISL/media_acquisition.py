@@ -0,0 +1,145 @@
+import asyncio
+import os
+import threading
+import time
+import uuid
+from urllib.parse import urlsplit
+
+from external_media_downloader import (
+    BASE_SIGN_DICTIONARY_URL,
+    HEADERS,
+    MEDIA_FOLDER,
+    parse_video_url,
+)
+
+# --- 1. SETTINGS ---
+
+# Politeness towards the dictionary site: a token bucket per host replaces the fixed
+# time.sleep(1) per word, so a handful of missing words go out together.
+HOST_RATE_PER_SECOND = float(os.getenv("ISL_HOST_RATE_PER_SECOND", "2"))
+HOST_BURST = int(os.getenv("ISL_HOST_BURST", "5"))
+MAX_CONNECTIONS = int(os.getenv("ISL_MAX_CONNECTIONS", "8"))
+SCRAPE_TIMEOUT = 10
+DOWNLOAD_TIMEOUT = 20
+
+# --- 2. PER-HOST RATE LIMITER ---
+
+class HostRateLimiter:
+    """
+    Token bucket per host: `burst` requests at once, then `rate` requests per second.
+    One instance is shared by every caller in the process. Each Flask request runs its own
+    event loop (asyncio.run), so the buckets sit behind a thread lock, not an asyncio.Lock:
+    a caller reserves its slot under the lock and sleeps on its own loop until it is due.
+    """
+
+    def __init__(self, rate=HOST_RATE_PER_SECOND, burst=HOST_BURST):
+        self.rate = max(float(rate), 0.001)
+        self.burst = max(int(burst), 1)
+        self._buckets = {}  # host -> [tokens, last_refill]; tokens go negative for reserved slots
+        self._lock = threading.Lock()
+
+    def reserve(self, url):
+        """Takes the next slot for the url's host; returns how many seconds until it may be used."""
+        host = urlsplit(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            bucket = self._buckets.setdefault(host, [float(self.burst), now])
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            bucket[0] -= 1
+            return max(0.0, -bucket[0] / self.rate)
+
+    async def acquire(self, url):
+        delay = self.reserve(url)
+        if delay:
+            await asyncio.sleep(delay)
+
+
+# Shared by every acquire_many() call, so concurrent requests together stay within the limit
+host_limiter = HostRateLimiter()
+
+# --- 3. SCRAPE + DOWNLOAD ---
+
+async def find_video_url(session, limiter, word, base_url=BASE_SIGN_DICTIONARY_URL):
+    """Async version of scrape_sign_video_url: fetches the word page and extracts the video URL."""
+    import aiohttp
+
+    search_url = f"{base_url}/word/{word.lower()}/"
+    try:
+        await limiter.acquire(search_url)
+        async with session.get(search_url, timeout=aiohttp.ClientTimeout(total=SCRAPE_TIMEOUT)) as response:
+            response.raise_for_status()
+            html = await response.read()
+        return parse_video_url(html, base_url=base_url)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print(f"❌ Scraping failed for {word}: Network/Request Error: {e}")
+    except Exception as e:
+        print(f"❌ Scraping failed for {word}: Parsing Error: {e}")
+    return None
+
+
+async def download_to_file(session, limiter, url, local_path):
+    """Streams `url` into a temp file next to `local_path`, then renames it into place."""
+    import aiohttp
+
+    await limiter.acquire(url)
+    # A unique name next to the clip, created by open() so it gets the default file mode
+    # (a mkstemp file would be owner-only 0600, and keep that mode once renamed)
+    temp_path = f"{local_path}.{uuid.uuid4().hex}.part"
+    try:
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=DOWNLOAD_TIMEOUT)) as response:
+            response.raise_for_status()
+            with open(temp_path, "xb") as f:
+                async for chunk in response.content.iter_chunked(1 << 16):
+                    f.write(chunk)
+        # Atomic on POSIX and Windows: readers see either no file or the complete clip
+        os.replace(temp_path, local_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return local_path
+
+
+async def acquire_word(session, limiter, word, base_url, media_folder):
+    video_url = await find_video_url(session, limiter, word, base_url=base_url)
+    if not video_url:
+        print(f"❌ No suitable video URL found online for {word}")
+        return None
+
+    local_path = os.path.join(media_folder, f"{word.upper()}.mp4")
+    try:
+        await download_to_file(session, limiter, video_url, local_path)
+    except Exception as e:
+        print(f"❌ Download failed for {word}: {e}")
+        return None
+
+    print(f"✅ SUCCESSFULLY CACHED ISL SIGN: {os.path.basename(local_path)}")
+    return local_path
+
+
+async def acquire_many(words, base_url=BASE_SIGN_DICTIONARY_URL, media_folder=MEDIA_FOLDER, limiter=None):
+    """
+    Scrapes and downloads all `words` concurrently over one pooled connection session.
+    Returns {word: local_path or None}. Duplicate words are fetched once.
+    """
+    import aiohttp
+
+    unique_words = list(dict.fromkeys(words))
+    if not unique_words:
+        return {}
+
+    os.makedirs(media_folder, exist_ok=True)
+    limiter = limiter or host_limiter
+    connector = aiohttp.TCPConnector(limit=MAX_CONNECTIONS)
+    async with aiohttp.ClientSession(headers=HEADERS, connector=connector) as session:
+        results = await asyncio.gather(
+            *(acquire_word(session, limiter, word, base_url, media_folder) for word in unique_words)
+        )
+    return dict(zip(unique_words, results))
+
+
+def acquire_missing_media(words, **kwargs):
+    """Blocking entry point for the Flask routes."""
+    if not words:
+        return {}
+    return asyncio.run(acquire_many(words, **kwargs))
@@ -0,0 +1,98 @@
+import asyncio
+import os
+import stat
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import media_acquisition
+from media_acquisition import HostRateLimiter, acquire_missing_media
+
+# ISL/ is a separate app whose module names repeat the root app's: keep its downloader
+# out of sys.modules, so root tests in the same run import their own
+sys.modules.pop("external_media_downloader", None)
+
+aiohttp_web = pytest.importorskip("aiohttp.web")
+
+RATE = 10.0
+BURST = 2
+
+
+class StandInDictionary:
+    """Local stand-in for the sign dictionary: word pages with a <video> tag, and the clips."""
+
+    def __init__(self):
+        self.request_times = []
+        self.port = None
+        self._ready = threading.Event()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+
+    async def word_page(self, request):
+        self.request_times.append(time.monotonic())
+        word = request.match_info["word"]
+        return aiohttp_web.Response(text=f'<video src="/clips/{word}.mp4"></video>', content_type="text/html")
+
+    async def clip(self, request):
+        self.request_times.append(time.monotonic())
+        return aiohttp_web.Response(body=b"clip " + request.match_info["name"].encode())
+
+    def _serve(self):
+        asyncio.set_event_loop(self._loop)
+        app = aiohttp_web.Application()
+        app.router.add_get("/word/{word}/", self.word_page)
+        app.router.add_get("/clips/{name}", self.clip)
+        self._runner = aiohttp_web.AppRunner(app, access_log=None)
+        self._loop.run_until_complete(self._runner.setup())
+        site = aiohttp_web.TCPSite(self._runner, "127.0.0.1", 0)
+        self._loop.run_until_complete(site.start())
+        self.port = site._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+
+    def __enter__(self):
+        self._thread.start()
+        self._ready.wait(10)
+        return self
+
+    def __exit__(self, *exc):
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(10)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(10)
+
+
+def test_concurrent_calls_share_one_host_budget(tmp_path, monkeypatch):
+    monkeypatch.setattr(media_acquisition, "host_limiter", HostRateLimiter(rate=RATE, burst=BURST))
+    batches = [[f"word{batch}{i}" for i in range(5)] for batch in range(2)]
+    results = {}
+
+    with StandInDictionary() as server:
+        base_url = f"http://127.0.0.1:{server.port}"
+
+        # Two requests acquiring at the same time, each with its own event loop (as in the Flask app)
+        def run(words):
+            results.update(acquire_missing_media(words, base_url=base_url, media_folder=str(tmp_path)))
+
+        threads = [threading.Thread(target=run, args=(words,)) for words in batches]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(30)
+
+    assert all(results[word] for words in batches for word in words)
+    path = results["word00"]
+    assert open(path, "rb").read() == b"clip word00.mp4"
+    assert stat.S_IMODE(os.stat(path).st_mode) & 0o044 == 0o044 or os.name == "nt"
+
+    # Token bucket: any window of t seconds holds at most BURST + RATE * t requests, across both calls
+    times = sorted(server.request_times)
+    assert len(times) == 20
+    for first in range(len(times)):
+        for last in range(first, len(times)):
+            allowed = BURST + RATE * (times[last] - times[first] + 0.02)
+            assert last - first + 1 <= allowed, f"{last - first + 1} requests in {times[last] - times[first]:.3f}s"
+    assert times[-1] - times[0] >= (len(times) - BURST) / RATE - 0.05
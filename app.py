@@ -1,58 +1,242 @@
-from flask import Flask, render_template, request, jsonify, send_from_directory
-import os
+from flask import Flask, Response, render_template, request, jsonify, send_from_directory, stream_with_context
 import json
-import wikipedia
+import logging
+import os
+import re
+import threading
 from dotenv import load_dotenv 
-from openai import OpenAI 
 # --- IMPORTING SEPARATED FILES ---
-from grammar_convert import convert_to_asl_grammar
-from external_media_downloader import download_sign_media # Kept for structure, though logic is disabled
-from finger_spelling import get_fingerspelling_paths
+# Heavy dependencies (transformers, NLTK, openai, wikipedia, bs4) are imported on first use
+import grammar_convert
+from grammar_convert import convert_to_asl_grammar, convert_many_to_asl_grammar
+from external_media_downloader import download_sign_media
+from finger_spelling import get_fingerspelling_atlas, get_fingerspelling_paths
+from fingerspell_atlas import ATLAS_FOLDER, fingerspell_atlas
+from lexicon import lexicon
+from media_index import media_index
+from media_metadata import media_metadata
+from media_store import is_content_addressed
+from gloss_resolver import GlossResolver
+from concept_cache import ConceptCache
+from prefetch_queue import PrefetchQueue
+from translation_pipeline import TranslationPipeline
+from playback_metrics import PlaybackMetrics
+import metrics
+from metrics import family, log_sampled, span
+from sequence_render import SEQUENCE_FOLDER, SequenceRenderError, render_sequence
 # ---------------------------------
 
 # --- 1. INITIAL SETUP ---
 
 load_dotenv()
+
+# Upstream timeouts (seconds), so a stuck GPT call cannot hold a worker indefinitely
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "10"))
+
 openai_client = None
-try:
-    openai_client = OpenAI()
-except Exception as e:
-    # If key is missing, GPT fallback is gracefully disabled
-    print(f"WARNING: GPT fallback disabled. Error: {e}")
+_openai_state = "unloaded" # unloaded -> ready | disabled
+_openai_lock = threading.Lock()
+
+def get_openai_client():
+    """Creates the OpenAI client on first use; returns None if GPT fallback is unavailable."""
+    global openai_client, _openai_state
+    if _openai_state == "unloaded":
+        with _openai_lock:
+            if _openai_state == "unloaded":
+                try:
+                    from openai import OpenAI
+                    openai_client = OpenAI(timeout=OPENAI_TIMEOUT)
+                    _openai_state = "ready"
+                except Exception as e:
+                    # If key is missing, GPT fallback is gracefully disabled
+                    print(f"WARNING: GPT fallback disabled. Error: {e}")
+                    _openai_state = "disabled"
+    return openai_client
 
 
 app = Flask(__name__)
 MEDIA_FOLDER = "media"
 UPLOAD_FOLDER = "uploads"
 
+# Unversioned /media URLs are revalidated hourly; ?v=<content hash> URLs never change
+MEDIA_MAX_AGE = int(os.getenv("MEDIA_MAX_AGE", "3600"))
+MEDIA_IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
 os.makedirs(MEDIA_FOLDER, exist_ok=True)
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.config["MEDIA_FOLDER"] = MEDIA_FOLDER
 app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
 
+# Repeat concept searches (e.g. "Chennai") are served from disk instead of GPT/Wikipedia
+concept_cache = ConceptCache(
+    db_path=os.getenv("CONCEPT_CACHE_DB", "concept_cache.sqlite3"),
+    ttl_seconds=float(os.getenv("CONCEPT_CACHE_TTL", str(7 * 86400))),
+    negative_ttl_seconds=float(os.getenv("CONCEPT_CACHE_NEGATIVE_TTL", "3600")),
+)
+
+# Phrase / case / lemma / synonym matching against the SQLite lexicon, to avoid fingerspelling
+gloss_resolver = GlossResolver(media_index, lexicon)
+
+# Background acquisition of missing signs: the request is answered with fingerspelling now and
+# the real sign is picked up by later requests. Off by default because external_media_downloader
+# still points at a placeholder dictionary URL; set PREFETCH_ENABLED=1 once it is configured.
+def on_sign_acquired(word, path):
+    # Make the new clip resolvable right away and record its duration/size for the API
+    media_metadata.get(media_index.add(path))
+
+prefetch_queue = None
+if os.getenv("PREFETCH_ENABLED", "0") == "1":
+    prefetch_queue = PrefetchQueue(
+        metrics.timed("download")(download_sign_media),
+        db_path=os.getenv("PREFETCH_DB", "prefetch_queue.sqlite3"),
+        workers=int(os.getenv("PREFETCH_WORKERS", "2")),
+        on_success=on_sign_acquired,
+    )
+    prefetch_queue.start()
+
+# normalize → gloss → resolve → fallback, shared by every translation route
+pipeline = TranslationPipeline(
+    gloss=convert_to_asl_grammar,
+    gloss_many=convert_many_to_asl_grammar,
+    media_index=media_index,
+    resolver=gloss_resolver,
+    fingerspell=get_fingerspelling_paths,
+    on_missing=prefetch_queue.enqueue if prefetch_queue else None,
+    describe=media_metadata.describe_url,
+    atlas=get_fingerspelling_atlas,
+)
+pipeline.add_timing_hook(metrics.record_stage)
+pipeline.add_tier_hook(metrics.record_tier)
+CONVERT_BATCH_LIMIT = int(os.getenv("CONVERT_BATCH_LIMIT", "64"))
+# Clips joined by one /convert_sequence call (each is a decode + re-encode in ffmpeg)
+SEQUENCE_CLIP_LIMIT = int(os.getenv("SEQUENCE_CLIP_LIMIT", "100"))
+
+# Clip-to-clip transition gaps as measured by the browser player
+playback_metrics = PlaybackMetrics()
+
+def component_metrics():
+    """/metrics lines read from the caches, the model batcher, the player reports and the prefetch queue."""
+    gloss = grammar_convert.gloss_cache.stats()
+    concept = concept_cache.stats()
+    batcher = grammar_convert.gloss_batcher.stats()
+    playback = playback_metrics.summary()
+    concept_hits = concept["hits"] + concept["negative_hits"]
+    concept_lookups = concept_hits + concept["misses"]
+
+    lines = family("asl_cache_hits_total", "counter", "Cache lookups answered from the cache.", [
+        ({"cache": "gloss"}, gloss["hits"]),
+        ({"cache": "concept"}, concept_hits),
+    ])
+    lines += family("asl_cache_misses_total", "counter", "Cache lookups that had to compute the value.", [
+        ({"cache": "gloss"}, gloss["misses"]),
+        ({"cache": "concept"}, concept["misses"]),
+    ])
+    lines += family("asl_cache_hit_ratio", "gauge", "Hits / lookups since startup.", [
+        ({"cache": "gloss"}, gloss["hit_rate"]),
+        ({"cache": "concept"}, round(concept_hits / concept_lookups, 3) if concept_lookups else 0.0),
+    ])
+    lines += family("asl_cache_entries", "gauge", "Entries held in memory.", [({"cache": "gloss"}, gloss["size"])])
+    lines += family("asl_cache_evictions_total", "counter", "Entries evicted by the LRU bound.",
+                    [({"cache": "gloss"}, gloss["evictions"])])
+    lines += family("asl_concept_shared_waits_total", "counter",
+                    "Concept lookups that waited on an identical in-flight lookup.", [({}, concept["shared_waits"])])
+
+    lines += family("asl_model_queue_depth", "gauge", "Texts waiting for the model micro-batcher.",
+                    [({}, batcher["queue_depth"])])
+    lines += family("asl_model_batches_total", "counter", "Model batches run.", [({}, batcher["batches_run"])])
+    lines += family("asl_model_batch_items_total", "counter", "Texts glossed by the model.",
+                    [({}, batcher["items_processed"])])
+    lines += family("asl_model_state", "gauge", "1 for the grammar model's current load state.",
+                    [({"state": grammar_convert.model_state}, 1)])
+
+    lines += family("asl_playback_reports_total", "counter", "Sequences reported by the browser player.",
+                    [({}, playback["reports"])])
+    lines += family("asl_playback_gaps_total", "counter", "Clip transitions reported by the browser player.",
+                    [({}, playback["gaps"])])
+    for name, key, help_text in (
+        ("asl_playback_gap_ms", "gap_ms", "Clip-to-clip gap over the recent reports, by quantile."),
+        ("asl_playback_first_sign_ms", "first_sign_ms", "Submit to first sign over the recent reports, by quantile."),
+    ):
+        quantiles = playback[key] or {}
+        lines += family(name, "gauge", help_text, [
+            ({"quantile": quantile}, quantiles.get(field))
+            for quantile, field in (("0.5", "p50"), ("0.95", "p95"), ("0.99", "p99"), ("1", "max"))
+        ])
+
+    if prefetch_queue:
+        jobs = prefetch_queue.status()["jobs"]
+        lines += family("asl_prefetch_jobs", "gauge", "Sign download jobs by state.",
+                        [({"state": state}, count) for state, count in jobs.items()])
+    return lines
+
+metrics.registry.add_collector(component_metrics)
+
+# Load the grammar model in the background so startup returns immediately (ASL_WARMUP=0 for purely lazy loading)
+if os.getenv("ASL_WARMUP", "1") == "1":
+    grammar_convert.start_warmup()
+    # Probe any clips added since the last `python media_metadata.py` run
+    threading.Thread(target=media_metadata.update, name="media-metadata", daemon=True).start()
+    # Render the alphabet atlas if the letter clips changed (no-op when it is already built)
+    fingerspell_atlas.start_build()
+
 # --- 2. GPT FALLBACK FUNCTION (STAYS HERE for direct API call) ---
 
+def gpt_summary_request(word):
+    """Chat completion arguments for explaining `word` (shared with the async client in asgi_app.py)."""
+    system_prompt = ("You are an AI assistant for a sign language translator app. Your task is to provide a very short, simple, and accessible explanation (max 2 sentences) for a word that does not have a sign video. Focus on defining proper nouns like cities, people, or specific concepts. The output must be pure, clean text.")
+    return {
+        "model": "gpt-3.5-turbo",
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": f"Explain the term: '{word}'"},
+        ],
+        "max_tokens": 100,
+        "temperature": 0.3,
+    }
+
 def generate_gpt_summary(word):
-    """Generates a simple explanation of a word using a GPT model."""
-    if not openai_client:
+    """Generates a simple explanation of a word using a GPT model. API errors are raised."""
+    client = get_openai_client()
+    if not client:
         return None
-    # ... (Rest of the GPT function is unchanged) ...
-    system_prompt = ("You are an AI assistant for a sign language translator app. Your task is to provide a very short, simple, and accessible explanation (max 2 sentences) for a word that does not have a sign video. Focus on defining proper nouns like cities, people, or specific concepts. The output must be pure, clean text.")
+    with span("gpt"):
+        response = client.chat.completions.create(**gpt_summary_request(word))
+    summary = response.choices[0].message.content.strip()
+    return summary if summary else None
+
+def first_sentences(text, count=2):
+    """Trims text to its first `count` sentences (mirrors wikipedia.summary(sentences=...))."""
+    sentences = re.split(r'(?<=[.!?])\s+', text.strip())
+    return " ".join(sentences[:count])
+
+def fetch_concept(query):
+    """
+    Looks up an explanation for a concept: GPT first, then Wikipedia.
+    Returns {"summary", "link", "source"} or None when neither source knows the term.
+    Network/API errors other than a missing page propagate so they are not cached as misses;
+    a failed GPT call still falls back to Wikipedia, but is re-raised if Wikipedia has no page.
+    """
+    gpt_error = None
     try:
-        response = openai_client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"Explain the term: '{word}'"},
-            ],
-            max_tokens=100,
-            temperature=0.3
-        )
-        summary = response.choices[0].message.content.strip()
-        return summary if summary else None
+        summary = generate_gpt_summary(query)
     except Exception as e:
-        print(f"Error calling GPT API for '{word}': {e}")
+        log_sampled("gpt_failed", "Error calling GPT API for '%s': %s", query, e, level=logging.WARNING, rate=1.0)
+        summary, gpt_error = None, e
+    if summary:
+        return {"summary": summary, "link": None, "source": "AI Explanation"}
+
+    import wikipedia
+
+    # A single page fetch gives both the intro text and the URL
+    try:
+        with span("wikipedia"):
+            page = wikipedia.page(query, auto_suggest=True, redirect=True)
+            summary = page.summary
+    except (wikipedia.exceptions.PageError, wikipedia.exceptions.DisambiguationError):
+        if gpt_error:
+            raise gpt_error
         return None
+    return {"summary": first_sentences(summary), "link": page.url, "source": "Wikipedia"}
 
 # --- 3. ROUTES ---
 
@@ -60,6 +244,36 @@ def generate_gpt_summary(word):
 def index():
     return render_template("index.html")
 
+@app.route("/ready")
+def ready():
+    # Readiness probe: 200 once the grammar model is loaded (or known to be unavailable)
+    status = {"ready": grammar_convert.is_ready(), "model": grammar_convert.model_state}
+    return jsonify(status), (200 if status["ready"] else 503)
+
+@app.route("/prefetch/status")
+def prefetch_status():
+    if not prefetch_queue:
+        return jsonify({"enabled": False})
+    word = request.args.get("word")
+    if word:
+        job = prefetch_queue.status(word)
+        return (jsonify(job), 200) if job else (jsonify({"error": f"'{word}' is not queued."}), 404)
+    return jsonify({"enabled": True, **prefetch_queue.status()})
+
+@app.route("/metrics/playback", methods=["GET", "POST"])
+def playback_metrics_route():
+    # The player posts {"first_sign_ms", "gaps_ms": [...], "clips"} after each sequence
+    if request.method == "POST":
+        if not playback_metrics.record(request.get_json(silent=True, force=True)):
+            return jsonify({"error": "Expected {\"gaps_ms\": [...], \"first_sign_ms\": ..., \"clips\": ...}."}), 400
+        return "", 204
+    return jsonify(playback_metrics.summary())
+
+@app.route("/metrics")
+def metrics_route():
+    # Prometheus scrape target: stage/operation latency histograms, tier and cache counters
+    return Response(metrics.registry.render(), content_type=metrics.CONTENT_TYPE)
+
 @app.route("/convert", methods=["POST"])
 def convert_text():
     # Handles full sentence conversion
@@ -67,38 +281,82 @@ def convert_text():
     if not text:
         return jsonify({"error": "No input provided."})
 
-    asl_text = convert_to_asl_grammar(text)
-    words = asl_text.split()
-    video_urls = []
-
-    try:
-        with open("word_to_media.json", "r") as f:
-            word_map = json.load(f)
-    except:
-        word_map = {}
-
-    for word in words:
-        media_file = word_map.get(word, f"{word}.mp4")
-        media_path = os.path.join(MEDIA_FOLDER, media_file)
-
-        if os.path.exists(media_path):
-            video_urls.append(f"/media/{media_file}")
-        else:
-            # --- FINGERSPELLING FALLBACK FOR SENTENCE WORDS (Optional) ---
-            fingerspelled_paths = get_fingerspelling_paths(word)
-            if fingerspelled_paths:
-                video_urls.extend(fingerspelled_paths)
-            else:
-                print(f"Skipping sign: {word} (No local video or fingerspelling letters found)")
-                continue 
+    result = pipeline.run(text)
 
     return jsonify({
-        "asl_gloss": asl_text,
-        "media": video_urls,
+        **result,
         "summary": None, 
         "link": None     
     })
 
+@app.route("/convert_batch", methods=["POST"])
+def convert_batch():
+    # Translates a list of sentences in one call; their model inference shares batches
+    data = request.get_json(silent=True) or {}
+    texts = data.get("texts")
+    if not isinstance(texts, list) or not texts or not all(isinstance(text, str) for text in texts):
+        return jsonify({"error": "Provide 'texts' as a non-empty list of strings."}), 400
+    if len(texts) > CONVERT_BATCH_LIMIT:
+        return jsonify({"error": f"At most {CONVERT_BATCH_LIMIT} texts per batch."}), 400
+
+    return jsonify({"results": pipeline.run_many(texts)})
+
+def local_search_events(query):
+    """Events for a query that has its own clip in the media folder, or None."""
+    media_index.refresh()
+    media_file_query = media_index.media_for(query.lower())
+    if not media_file_query:
+        return None
+    return [
+        ("summary", {"summary": f"Local video found for '{query}'.", "link": None}),
+        ("gloss", query),
+        ("media", pipeline.media_event(query, "exact", [media_index.url_for(media_file_query)])),
+    ]
+
+def concept_search_events(query, concept):
+    """Events for a looked-up concept (or None when no source knew it): its summary, then its signs."""
+    if concept:
+        summary = concept["summary"]
+        wiki_link = concept["link"]
+        summary_source = concept["source"]
+    else:
+        # If all external lookups fail
+        summary = f"No detailed explanation found for '{query}'. Attempting fingerspelling."
+        wiki_link = None
+        summary_source = "Fingerspelling Fallback"
+    yield "summary", {"summary": summary, "link": wiki_link}
+
+    # Convert the summary/explanation into ASL gloss words and find their signs
+    found_media = False
+    for stage, payload in pipeline.stream(summary or query): # Use summary or original query
+        if stage == "media" and payload["urls"]:
+            found_media = True
+        yield stage, payload
+
+    # --- FINAL CHECK: If no signs were found AT ALL, spell the original query ---
+    if not found_media and summary_source == "Fingerspelling Fallback":
+        yield "media", pipeline.fingerspell_event(query)
+
+def search_events(query):
+    """
+    Concept search as pipeline events: ("summary", {...}) once the explanation is known,
+    then the usual ("gloss", ...) / ("media", ...) events for its signs.
+    """
+    # 1. Attempt Local Video Lookup for the main query word
+    local_events = local_search_events(query)
+    if local_events:
+        yield from local_events
+        return
+
+    # 2. Intelligent Fallback (GPT/Wikipedia/Rule-Based), cached per normalized query
+    try:
+        concept = concept_cache.get_or_fetch(query, fetch_concept)
+    except Exception as e:
+        log_sampled("concept_failed", "Concept lookup failed for '%s': %s", query, e, level=logging.WARNING, rate=1.0)
+        concept = None
+
+    yield from concept_search_events(query, concept)
+
 @app.route("/search_convert", methods=["POST"])
 def search_convert():
     # Handles concept search (e.g., "Chennai")
@@ -108,82 +366,136 @@ def search_convert():
     if not query:
         return jsonify({"error": "No query provided."}), 400
 
-    # 1. Attempt Local Video Lookup for the main query word
-    media_file_query = f"{query.lower()}.mp4"
-    media_path_query = os.path.join(MEDIA_FOLDER, media_file_query)
-    
-    if os.path.exists(media_path_query):
-        return jsonify({
-            "asl_gloss": query, 
-            "media": [f"/media/{media_file_query}"],
-            "summary": f"Local video found for '{query}'.",
-            "link": None
-        })
-    
-    summary = None
-    wiki_link = None 
+    events = list(search_events(query))
+    concept = next(payload for stage, payload in events if stage == "summary")
+    return jsonify({**pipeline.collect(events), **concept})
 
-    # 2. Intelligent Fallback (GPT/Wikipedia/Rule-Based)
-    summary = generate_gpt_summary(query)
-    
-    if summary:
-        summary_source = "AI Explanation"
+@app.route("/convert_sequence", methods=["POST"])
+def convert_sequence():
+    # Joins a sign sequence into one MP4 so the player makes a single request.
+    # Accepts {"media": [...]} as returned by /convert, or {"gloss": "HELLO HOW ..."}.
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        data = {}
+    media_urls, gloss = data.get("media"), data.get("gloss")
+    if media_urls:
+        if not isinstance(media_urls, list) or not all(isinstance(url, str) for url in media_urls):
+            return jsonify({"error": "'media' must be a list of strings."}), 400
+    elif gloss:
+        if not isinstance(gloss, str):
+            return jsonify({"error": "'gloss' must be a string."}), 400
+        media_urls = pipeline.run_gloss(gloss)["media"]
     else:
-        # If GPT fails, check Wikipedia (assuming you don't care about the 429 error)
-        try:
-            page = wikipedia.page(query, auto_suggest=True, redirect=True)
-            summary = wikipedia.summary(query, sentences=2, auto_suggest=True, redirect=True)
-            wiki_link = page.url 
-            summary_source = "Wikipedia"
-        except Exception:
-            # If all external lookups fail
-            summary = f"No detailed explanation found for '{query}'. Attempting fingerspelling."
-            summary_source = "Fingerspelling Fallback"
-    
-    # Convert the summary/explanation into ASL gloss words
-    asl_text = convert_to_asl_grammar(summary or query) # Use summary or original query
-    words = asl_text.split()
-        
-    # Find signs for the words in the resulting summary/ASL text
-    media_paths = []
-    try:
-        with open("word_to_media.json", "r") as f:
-            word_map = json.load(f)
-    except:
-        word_map = {}
-
-    for word in words:
-        media_file = word_map.get(word, f"{word}.mp4")
-        media_path = os.path.join(MEDIA_FOLDER, media_file)
-        
-        if os.path.exists(media_path):
-            media_paths.append(f"/media/{media_file}")
-        else:
-            # --- FINGERSPELLING FALLBACK FOR MISSING WORD IN SUMMARY (NEW) ---
-            fingerspelled_paths = get_fingerspelling_paths(word)
-            if fingerspelled_paths:
-                media_paths.extend(fingerspelled_paths)
-            else:
-                print(f"Skipping sign: {word} (No local file or fingerspelling letters found)")
-                continue 
+        return jsonify({"error": "Provide 'media' or 'gloss'."}), 400
+    if len(media_urls) > SEQUENCE_CLIP_LIMIT:
+        return jsonify({"error": f"At most {SEQUENCE_CLIP_LIMIT} clips per sequence."}), 400
 
-    # --- FINAL CHECK: If no signs were found AT ALL, spell the original query ---
-    if not media_paths and summary_source == "Fingerspelling Fallback":
-        final_fingerspelled_paths = get_fingerspelling_paths(query)
-        media_paths.extend(final_fingerspelled_paths)
+    media_index.refresh()
+    media_files = []
+    for url in media_urls:
+        url = url.split("?", 1)[0] # drop the ?v= cache-busting version
+        media_file = url.rsplit("/", 1)[-1]
+        # Only whole clips from our own media folder can be joined (no GIFs, no foreign paths)
+        if url != f"/media/{media_file}" or not media_file.endswith(".mp4") or not media_index.has_file(media_file):
+            return jsonify({"error": f"Cannot join '{url}'."}), 400
+        media_files.append(media_file)
 
+    try:
+        filename = render_sequence(media_files)
+    except SequenceRenderError as e:
+        return jsonify({"error": str(e)}), 503
 
-    return jsonify({
-        "asl_gloss": asl_text,
-        "media": media_paths,
-        "summary": summary,
-        "link": wiki_link 
-    })
+    return jsonify({"url": f"/sequence/{filename}", "count": len(media_files)})
 
+@app.route("/sequence/<filename>")
+def sequence(filename):
+    # Sequence names are keyed by their clips' content fingerprints, so a file never changes once written
+    response = send_from_directory(SEQUENCE_FOLDER, filename, conditional=True, max_age=MEDIA_IMMUTABLE_MAX_AGE)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+@app.route("/atlas/<filename>")
+def atlas(filename):
+    # Atlas names are content hashes of their source clips, so they never change once written;
+    # byte ranges let the player seek to a letter without downloading the whole clip first
+    response = send_from_directory(ATLAS_FOLDER, filename, conditional=True, max_age=MEDIA_IMMUTABLE_MAX_AGE)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
 
 @app.route("/media/<filename>")
 def media(filename):
-    return send_from_directory(MEDIA_FOLDER, filename)
+    # The content hash doubles as a strong ETag, identical on every host behind a CDN.
+    # Checked against the file's size and mtime, so a clip overwritten in place gets a new one
+    fingerprint = media_index.fingerprint(os.path.basename(filename), verify=True)
+
+    # conditional=True gives ETag/Last-Modified (304s) and byte-range (206) support for seeking
+    response = send_from_directory(
+        MEDIA_FOLDER, filename, conditional=True, etag=fingerprint or True, max_age=MEDIA_MAX_AGE
+    )
+    response.cache_control.public = True
+
+    # Content-addressed name, or versioned URL matching the current content: browsers and CDNs may keep it forever
+    version = request.args.get("v")
+    if is_content_addressed(filename) or (version and version == fingerprint):
+        response.cache_control.max_age = MEDIA_IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+    return response
+
+# --- 4. STREAMING VARIANTS ---
+# Same work as /convert and /search_convert, sent as newline-delimited JSON while it happens,
+# so the page can show the gloss and start the first clip before the last word is resolved:
+#   {"event": "summary", "summary", "link"}   (search only)
+#   {"event": "gloss", "asl_gloss"}
+#   {"event": "media", "gloss", "tier", "urls"}   (one per sign, in sentence order)
+#   {"event": "done"} or {"event": "error", "error"}
+
+NDJSON_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no", # keep nginx from buffering the stream
+}
+NDJSON_DONE = json.dumps({"event": "done"}) + "\n"
+NDJSON_ERROR = json.dumps({"event": "error", "error": "Conversion failed."}) + "\n"
+
+def ndjson_line(stage, payload):
+    """The stream line for one pipeline event, or None for internal stages (normalize, resolve)."""
+    if stage == "gloss":
+        return json.dumps({"event": "gloss", "asl_gloss": payload}) + "\n"
+    if stage in ("summary", "media"):
+        return json.dumps({"event": stage, **payload}) + "\n"
+    return None
+
+def ndjson_response(events):
+    def generate():
+        try:
+            for stage, payload in events:
+                line = ndjson_line(stage, payload)
+                if line:
+                    yield line
+            yield NDJSON_DONE
+        except Exception as e:
+            # Headers are already sent, so failures are reported in-band
+            log_sampled("stream_failed", "Streaming conversion failed: %s", e, level=logging.WARNING, rate=1.0)
+            yield NDJSON_ERROR
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson", headers=NDJSON_HEADERS)
+
+@app.route("/convert_stream", methods=["POST"])
+def convert_stream():
+    text = request.form.get("text")
+    if not text:
+        return jsonify({"error": "No input provided."}), 400
+    return ndjson_response(pipeline.stream(text))
+
+@app.route("/search_convert_stream", methods=["POST"])
+def search_convert_stream():
+    data = request.get_json(silent=True) or {}
+    query = data.get("query", "").strip()
+    if not query:
+        return jsonify({"error": "No query provided."}), 400
+    return ndjson_response(search_events(query))
+
 
 if __name__ == "__main__":
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,235 @@
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import aiohttp
+from a2wsgi import WSGIMiddleware
+from quart import Quart, Response, jsonify, request
+
+# The Flask app keeps serving everything that is not I/O-bound (pages, media, sequences);
+# its pipeline, caches and helpers are shared, so both modes translate identically.
+import app as wsgi
+from app import (
+    CONVERT_BATCH_LIMIT,
+    NDJSON_DONE,
+    NDJSON_ERROR,
+    NDJSON_HEADERS,
+    OPENAI_TIMEOUT,
+    concept_cache,
+    concept_search_events,
+    first_sentences,
+    gpt_summary_request,
+    local_search_events,
+    ndjson_line,
+    pipeline,
+)
+from metrics import log_sampled, span
+
+# --- 1. SETTINGS ---
+# Run with:  gunicorn -c gunicorn_asgi.conf.py asgi_app:application
+# (or for development:  uvicorn asgi_app:application --reload)
+
+# Model inference and rule-based glossing are CPU-bound: they run on a bounded thread pool
+# so the event loop keeps accepting requests while GPT/Wikipedia calls are in flight.
+ASGI_INFERENCE_WORKERS = int(os.getenv("ASGI_INFERENCE_WORKERS", "4"))
+# Threads serving the remaining (synchronous) Flask routes
+ASGI_WSGI_WORKERS = int(os.getenv("ASGI_WSGI_WORKERS", "8"))
+
+WIKIPEDIA_API_URL = os.getenv("WIKIPEDIA_API_URL", "https://en.wikipedia.org/w/api.php")
+WIKIPEDIA_TIMEOUT = float(os.getenv("WIKIPEDIA_TIMEOUT", "5"))
+
+quart_app = Quart(__name__)
+inference_executor = ThreadPoolExecutor(max_workers=ASGI_INFERENCE_WORKERS, thread_name_prefix="asl-inference")
+
+http_session = None
+async_openai_client = None
+
+@quart_app.before_serving
+async def open_clients():
+    global http_session, async_openai_client
+    http_session = aiohttp.ClientSession(
+        timeout=aiohttp.ClientTimeout(total=WIKIPEDIA_TIMEOUT),
+        headers={"User-Agent": "SignLink/1.0"},
+    )
+    try:
+        from openai import AsyncOpenAI
+        async_openai_client = AsyncOpenAI(timeout=OPENAI_TIMEOUT)
+    except Exception as e:
+        # If key is missing, GPT fallback is gracefully disabled
+        print(f"WARNING: GPT fallback disabled. Error: {e}")
+        async_openai_client = None
+
+@quart_app.after_serving
+async def close_clients():
+    await http_session.close()
+    if async_openai_client:
+        await async_openai_client.close()
+    inference_executor.shutdown(wait=False)
+
+# --- 2. OFFLOADING HELPERS ---
+
+async def offload(fn, *args):
+    """Runs a blocking pipeline call on the inference pool."""
+    return await asyncio.get_running_loop().run_in_executor(inference_executor, fn, *args)
+
+async def offload_events(events):
+    """Steps a synchronous pipeline event generator on the inference pool, one event at a time."""
+    finished = object()
+    while True:
+        event = await offload(next, events, finished)
+        if event is finished:
+            return
+        yield event
+
+# --- 3. NON-BLOCKING CONCEPT LOOKUP ---
+
+async def generate_gpt_summary_async(word):
+    """Async generate_gpt_summary: same prompt, bounded by OPENAI_TIMEOUT. API errors are raised."""
+    if not async_openai_client:
+        return None
+    with span("gpt"):
+        response = await async_openai_client.chat.completions.create(**gpt_summary_request(word))
+    summary = response.choices[0].message.content.strip()
+    return summary if summary else None
+
+async def fetch_wikipedia_async(query):
+    """
+    One MediaWiki API call: the top search hit for `query` (like auto_suggest), following
+    redirects, with its plain-text intro and URL. Returns None for no hit or a disambiguation page.
+    """
+    params = {
+        "action": "query",
+        "format": "json",
+        "generator": "search",
+        "gsrsearch": query,
+        "gsrlimit": "1",
+        "redirects": "1",
+        "prop": "extracts|info|pageprops",
+        "exintro": "1",
+        "explaintext": "1",
+        "inprop": "url",
+        "ppprop": "disambiguation",
+    }
+    with span("wikipedia"):
+        async with http_session.get(WIKIPEDIA_API_URL, params=params) as response:
+            response.raise_for_status()
+            data = await response.json(content_type=None)
+
+    pages = list(data.get("query", {}).get("pages", {}).values())
+    if not pages or "disambiguation" in pages[0].get("pageprops", {}) or not pages[0].get("extract"):
+        return None
+    page = pages[0]
+    return {"summary": first_sentences(page["extract"]), "link": page.get("fullurl"), "source": "Wikipedia"}
+
+async def fetch_concept_async(query):
+    """Async fetch_concept: GPT first, then Wikipedia. Network errors propagate and are not cached."""
+    gpt_error = None
+    try:
+        summary = await generate_gpt_summary_async(query)
+    except Exception as e:
+        log_sampled("gpt_failed", "Error calling GPT API for '%s': %s", query, e, level=logging.WARNING, rate=1.0)
+        summary, gpt_error = None, e
+    if summary:
+        return {"summary": summary, "link": None, "source": "AI Explanation"}
+    concept = await fetch_wikipedia_async(query)
+    if concept is None and gpt_error:
+        raise gpt_error # a failed GPT call is not a real "not found"
+    return concept
+
+async def search_events_async(query):
+    """Async search_events: the concept lookup is awaited, the pipeline runs on the inference pool."""
+    local_events = local_search_events(query)
+    if local_events:
+        for event in local_events:
+            yield event
+        return
+
+    try:
+        concept = await concept_cache.get_or_fetch_async(query, fetch_concept_async)
+    except Exception as e:
+        log_sampled("concept_failed", "Concept lookup failed for '%s': %r", query, e, level=logging.WARNING, rate=1.0)
+        concept = None
+
+    async for event in offload_events(concept_search_events(query, concept)):
+        yield event
+
+def ndjson_response(events):
+    async def generate():
+        try:
+            async for stage, payload in events:
+                line = ndjson_line(stage, payload)
+                if line:
+                    yield line
+            yield NDJSON_DONE
+        except Exception as e:
+            # Headers are already sent, so failures are reported in-band
+            log_sampled("stream_failed", "Streaming conversion failed: %s", e, level=logging.WARNING, rate=1.0)
+            yield NDJSON_ERROR
+
+    return Response(generate(), mimetype="application/x-ndjson", headers=NDJSON_HEADERS)
+
+# --- 4. ASYNC ROUTES ---
+# Same request/response contract as the Flask routes of the same name.
+
+@quart_app.route("/convert", methods=["POST"])
+async def convert_text():
+    text = (await request.form).get("text")
+    if not text:
+        return jsonify({"error": "No input provided."})
+
+    result = await offload(pipeline.run, text)
+    return jsonify({**result, "summary": None, "link": None})
+
+@quart_app.route("/convert_batch", methods=["POST"])
+async def convert_batch():
+    data = await request.get_json(silent=True) or {}
+    texts = data.get("texts")
+    if not isinstance(texts, list) or not texts or not all(isinstance(text, str) for text in texts):
+        return jsonify({"error": "Provide 'texts' as a non-empty list of strings."}), 400
+    if len(texts) > CONVERT_BATCH_LIMIT:
+        return jsonify({"error": f"At most {CONVERT_BATCH_LIMIT} texts per batch."}), 400
+
+    return jsonify({"results": await offload(pipeline.run_many, texts)})
+
+@quart_app.route("/search_convert", methods=["POST"])
+async def search_convert():
+    data = await request.get_json(silent=True) or {}
+    query = data.get("query", "").strip()
+    if not query:
+        return jsonify({"error": "No query provided."}), 400
+
+    events = [event async for event in search_events_async(query)]
+    concept = next(payload for stage, payload in events if stage == "summary")
+    return jsonify({**pipeline.collect(events), **concept})
+
+@quart_app.route("/convert_stream", methods=["POST"])
+async def convert_stream():
+    text = (await request.form).get("text")
+    if not text:
+        return jsonify({"error": "No input provided."}), 400
+    return ndjson_response(offload_events(pipeline.stream(text)))
+
+@quart_app.route("/search_convert_stream", methods=["POST"])
+async def search_convert_stream():
+    data = await request.get_json(silent=True) or {}
+    query = data.get("query", "").strip()
+    if not query:
+        return jsonify({"error": "No query provided."}), 400
+    return ndjson_response(search_events_async(query))
+
+# --- 5. ASGI ENTRY POINT ---
+
+ASYNC_PATHS = frozenset(rule.rule for rule in quart_app.url_map.iter_rules() if "<" not in rule.rule)
+flask_fallback = WSGIMiddleware(wsgi.app, workers=ASGI_WSGI_WORKERS)
+
+async def application(scope, receive, send):
+    """Async routes go to Quart (which also owns startup/shutdown); everything else to the Flask app."""
+    if scope["type"] == "http" and scope["path"] not in ASYNC_PATHS:
+        await flask_fallback(scope, receive, send)
+    else:
+        await quart_app(scope, receive, send)
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(application, host="127.0.0.1", port=int(os.getenv("PORT", "8000")))
@@ -0,0 +1,20 @@
+import os
+import stat
+
+# --- FILE MODE FOR ATOMIC REPLACES ---
+# Files that readers must never see half-written are written to a mkstemp temp file and
+# swapped in with os.replace. mkstemp creates that file 0600, and the swapped-in file keeps
+# whatever mode the temp file had, so every such writer sets it with match_file_mode first.
+
+# Read once at import, since os.umask() can only be read by changing it
+_UMASK = os.umask(0o022)
+os.umask(_UMASK)
+
+def match_file_mode(fd, path=None):
+    """Gives the temp file `fd` the mode of the file at `path` it will replace, or open()'s default (0666 & ~umask)."""
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode) if path else 0o666 & ~_UMASK
+    except OSError:
+        mode = 0o666 & ~_UMASK
+    if hasattr(os, "fchmod"): # not on Windows, where mkstemp files are not owner-only anyway
+        os.fchmod(fd, mode)
@@ -0,0 +1,126 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+# --- 1. MICRO-BATCHING SCHEDULER ---
+
+class MicroBatcher:
+    """
+    Collects single items submitted from many request threads and hands them
+    to `process_batch` as one list. A batch takes everything already queued and is
+    flushed as soon as no other submitted item is still on its way; only then, under
+    contention, does it wait for them, until it reaches `max_batch_size` items or the
+    oldest item has waited `max_wait_ms`. A request that arrives alone is run at once.
+    `process_batch` must return one result per input, in the same order.
+    """
+
+    def __init__(self, process_batch, max_batch_size=8, max_wait_ms=5.0, name="micro-batcher"):
+        self.process_batch = process_batch
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.name = name
+
+        self._queue = queue.Queue()
+        self._worker = None
+        self._start_lock = threading.Lock()
+        # Items submitted and not yet answered (queued, being queued, or in the running batch)
+        self._outstanding = 0
+        self._outstanding_lock = threading.Lock()
+
+        # Metrics (only written by the worker thread)
+        self.batches_run = 0
+        self.items_processed = 0
+        self.largest_batch = 0
+
+    def _ensure_worker(self):
+        if self._worker is not None:
+            return
+        with self._start_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._worker.start()
+
+    def submit(self, item):
+        """Queues one item and returns a Future that resolves to its result."""
+        return self.submit_many([item])[0]
+
+    def submit_many(self, items):
+        """
+        Queues several items and returns their Futures, in order. They are counted as
+        submitted before the first is queued, so the worker waits for all of them to share batches.
+        """
+        self._ensure_worker()
+        futures = [Future() for _ in items]
+        with self._outstanding_lock:
+            self._outstanding += len(futures)
+        for item, future in zip(items, futures):
+            self._queue.put((item, future))
+        return futures
+
+    def run(self, item, timeout=None):
+        """Blocking helper: submits one item and waits for its result."""
+        return self.submit(item).result(timeout=timeout)
+
+    def run_many(self, items, timeout=None):
+        """Submits several items at once so they can share batches; returns results in order."""
+        return [future.result(timeout=timeout) for future in self.submit_many(items)]
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+            # Nothing left in the queue: wait only for items already submitted by other
+            # requests (or the rest of a submit_many), never for ones that may come later
+            with self._outstanding_lock:
+                others_on_the_way = self._outstanding > len(batch)
+            remaining = deadline - time.monotonic()
+            if not others_on_the_way or remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            items = [item for item, _ in batch]
+            try:
+                results = self.process_batch(items)
+                if len(results) != len(items):
+                    raise RuntimeError(
+                        f"{self.name}: got {len(results)} results for {len(items)} items"
+                    )
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+            else:
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+            with self._outstanding_lock:
+                self._outstanding -= len(batch)
+
+            self.batches_run += 1
+            self.items_processed += len(batch)
+            self.largest_batch = max(self.largest_batch, len(batch))
+
+    def stats(self):
+        """Queue depth and batch fill figures for monitoring."""
+        avg_batch = self.items_processed / self.batches_run if self.batches_run else 0.0
+        return {
+            "queue_depth": self._queue.qsize(),
+            "batches_run": self.batches_run,
+            "items_processed": self.items_processed,
+            "largest_batch": self.largest_batch,
+            "avg_batch_size": round(avg_batch, 2),
+            "avg_batch_fill": round(avg_batch / self.max_batch_size, 3),
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+        }
@@ -0,0 +1,169 @@
+"""
+Concurrency scaling of /search_convert: the synchronous Flask app under gunicorn sync
+workers against the async mode (asgi_app.py under gunicorn_asgi.conf.py), both with the same
+number of worker processes.
+
+A local stub stands in for the OpenAI API and answers every chat completion after a
+fixed delay, so the numbers show how each mode copes with slow upstreams and not the
+network. Every request uses a fresh query, so the concept cache never answers it, and the
+grammar model is off (ASL_USE_AI=0): glossing is the rule-based fallback.
+
+Requires gunicorn and uvicorn, plus quart, a2wsgi and aiohttp for the async mode.
+
+    python benchmarks/asgi_load_test.py --workers 2 --latency-ms 300 --concurrency 1,8,32,64
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+import aiohttp
+from aiohttp import web
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVERS = {
+    "wsgi": ["app:app"],
+    "asgi": ["-c", "gunicorn_asgi.conf.py", "asgi_app:application"],
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+# --- stub upstream ---
+
+async def start_openai_stub(port, latency):
+    async def chat_completions(request):
+        await asyncio.sleep(latency)
+        return web.json_response({
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "gpt-3.5-turbo",
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "It is a big city in India. Many people live there."},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+        })
+
+    stub = web.Application()
+    stub.router.add_post("/v1/chat/completions", chat_completions)
+    runner = web.AppRunner(stub, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner
+
+
+# --- server under test ---
+
+def start_server(mode, port, stub_port, workers, workdir):
+    env = dict(
+        os.environ,
+        OPENAI_API_KEY="stub",
+        OPENAI_BASE_URL=f"http://127.0.0.1:{stub_port}/v1",
+        ASL_USE_AI="0",
+        ASL_WARMUP="0",
+        PREFETCH_ENABLED="0",
+        CONCEPT_CACHE_DB=os.path.join(workdir, f"concepts-{mode}.sqlite3"),
+    )
+    command = [sys.executable, "-m", "gunicorn", *SERVERS[mode],
+               "--workers", str(workers), "--bind", f"127.0.0.1:{port}"]
+    return subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+async def wait_until_up(session, base_url, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            async with session.get(f"{base_url}/prefetch/status") as response:
+                if response.status == 200:
+                    return
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"server at {base_url} did not come up")
+
+
+# --- load generation ---
+
+async def run_level(session, base_url, concurrency, total):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            query = f"concept {uuid.uuid4().hex[:12]}"
+            async with session.post(f"{base_url}/search_convert", json={"query": query}) as response:
+                await response.read()
+                if response.status != 200:
+                    errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return total / elapsed, statistics.median(latencies), p99, errors
+
+
+async def benchmark(args):
+    stub_port = free_port()
+    stub = await start_openai_stub(stub_port, args.latency_ms / 1000)
+    levels = [int(level) for level in args.concurrency.split(",")]
+    modes = list(SERVERS) if args.mode == "both" else [args.mode]
+
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            timeout = aiohttp.ClientTimeout(total=120)
+            connector = aiohttp.TCPConnector(limit=0)
+            async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+                for mode in modes:
+                    port = free_port()
+                    server = start_server(mode, port, stub_port, args.workers, workdir)
+                    base_url = f"http://127.0.0.1:{port}"
+                    try:
+                        await wait_until_up(session, base_url)
+                        await run_level(session, base_url, 1, 2) # warm imports and clients
+                        print(f"\n{mode}: {args.workers} workers, upstream latency {args.latency_ms:.0f} ms")
+                        print(f"{'concurrency':>12} {'req/s':>10} {'p50 ms':>10} {'p99 ms':>10} {'errors':>8}")
+                        for level in levels:
+                            total = max(args.requests, level * 2)
+                            rate, p50, p99, errors = await run_level(session, base_url, level, total)
+                            print(f"{level:>12} {rate:>10.1f} {p50 * 1000:>10.0f} {p99 * 1000:>10.0f} {errors:>8}")
+                    finally:
+                        server.terminate()
+                        server.wait(timeout=30)
+    finally:
+        await stub.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["wsgi", "asgi", "both"], default="both")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--latency-ms", type=float, default=300)
+    parser.add_argument("--concurrency", default="1,8,32,64")
+    parser.add_argument("--requests", type=int, default=64, help="requests per concurrency level (at least 2x the level)")
+    args = parser.parse_args()
+    asyncio.run(benchmark(args))
+
+
+if __name__ == "__main__":
+    main()
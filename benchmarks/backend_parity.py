@@ -0,0 +1,120 @@
+"""
+Parity, latency and memory check for the FLAN-T5 inference backends.
+
+Each backend is loaded in its own subprocess so peak RSS is measured in isolation.
+Outputs on a fixed sentence corpus are compared against the "torch" backend.
+
+    python benchmarks/backend_parity.py                      # all backends
+    python benchmarks/backend_parity.py --backends torch onnx
+    python benchmarks/backend_parity.py --min-match 0.9       # exit 1 below 90% exact match
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+CORPUS = [
+    "hello how are you",
+    "what is your name",
+    "I am going to school tomorrow",
+    "my brother is playing football",
+    "the dog is barking at the cat",
+    "I want to drink water",
+    "where do you live",
+    "she likes to eat pizza with her friends",
+    "good morning, have a nice day",
+    "we are learning sign language today",
+]
+
+
+def run_worker(backend, repeats):
+    """Loads one backend, converts the corpus, and prints a JSON report on stdout."""
+    from inference_backends import load_backend
+
+    started = time.perf_counter()
+    asl_pipe = load_backend(backend)
+    load_seconds = time.perf_counter() - started
+
+    prompts = [f"Convert to ISL grammar: {text}" for text in CORPUS]
+    outputs = []
+    latencies = []
+    for _ in range(repeats):
+        outputs = []
+        for prompt in prompts:
+            started = time.perf_counter()
+            result = asl_pipe(prompt, max_new_tokens=50, do_sample=False)
+            latencies.append(time.perf_counter() - started)
+            outputs.append(result[0]["generated_text"].strip().upper())
+
+    latencies.sort()
+    report = {
+        "backend": backend,
+        "load_seconds": round(load_seconds, 3),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+        "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 2),
+        # ru_maxrss is KiB on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "outputs": outputs,
+    }
+    print(json.dumps(report))
+
+
+def main():
+    from inference_backends import BACKENDS
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--min-match", type=float, default=None,
+                        help="fail if any backend's exact-match rate vs torch is below this")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.repeats)
+        return 0
+
+    backends = list(args.backends)
+    if "torch" not in backends:
+        backends.insert(0, "torch")
+
+    reports = {}
+    for backend in backends:
+        proc = subprocess.run(
+            [sys.executable, __file__, "--worker", backend, "--repeats", str(args.repeats)],
+            capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            print(f"❌ {backend}: failed to run\n{proc.stderr.strip()[-2000:]}")
+            continue
+        reports[backend] = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    reference = reports.get("torch")
+    if reference is None:
+        print("❌ The torch reference backend did not run; cannot check parity.")
+        return 1
+
+    failed = False
+    print(f"{'backend':<12}{'match':>8}{'load s':>9}{'p50 ms':>9}{'p99 ms':>9}{'RSS MB':>9}")
+    for backend, report in reports.items():
+        matches = sum(a == b for a, b in zip(report["outputs"], reference["outputs"]))
+        match_rate = matches / len(CORPUS)
+        print(f"{backend:<12}{match_rate:>8.0%}{report['load_seconds']:>9}{report['p50_ms']:>9}"
+              f"{report['p99_ms']:>9}{report['peak_rss_mb']:>9}")
+        for text, ref, out in zip(CORPUS, reference["outputs"], report["outputs"]):
+            if ref != out:
+                print(f"    differs on {text!r}: torch={ref!r} {backend}={out!r}")
+        if args.min_match is not None and match_rate < args.min_match:
+            failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,261 @@
+"""
+Micro-benchmarks for the translation hot path, on a synthetic media tree.
+
+Builds a throwaway media/ folder with --clips files (26 letters, the common word list,
+then generated words) plus matching word_to_media.json, imports the app inside it and
+replaces the FLAN-T5 pipeline with a deterministic stub, so results depend on this
+repo's code only. Cases cover short and long sentences and fingerspelling-heavy input:
+
+    rule_fallback_*   apply_rule_based_fallback
+    gloss_*           convert_to_asl_grammar (miss: stub model via the micro-batcher; hit: gloss cache)
+    fingerspell       get_fingerspelling_paths
+    resolve_*         the per-word lookup of /convert (pipeline.run_gloss on a finished gloss)
+    pipeline_*        /convert's whole pipeline.run, gloss cache cleared every time
+
+    python benchmarks/hot_path.py --clips 1000                       # print results
+    python benchmarks/hot_path.py --clips 1000 --save benchmarks/hot_path_baseline.json
+    python benchmarks/hot_path.py --compare benchmarks/hot_path_baseline.json   # exit 1 on regression
+
+Without the NLTK WordNet data the lemmatizer is replaced by the identity function; the
+report records which one ran and --compare refuses to mix the two.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import string
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+FILLERS = ["the", "a", "is", "are", "to", "of", "and", "in", "was", "will", "have", "that"]
+
+
+# --- synthetic environment ---
+
+def build_media_tree(workdir, clips, rng):
+    """Writes `clips` small files into workdir/media and maps every word to its clip. Returns the words."""
+    media = os.path.join(workdir, "media")
+    os.makedirs(media)
+    with open(os.path.join(ROOT, "common_words.txt"), encoding="utf-8") as f:
+        common = [word for line in f if not line.startswith("#") for word in line.split()]
+
+    letters = list(string.ascii_uppercase)
+    words = list(dict.fromkeys(common))[:max(0, clips - len(letters))]
+    seen = set(words)
+    while len(words) + len(letters) < clips:
+        word = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 9)))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+
+    for name in letters + words:
+        with open(os.path.join(media, f"{name}.mp4"), "wb") as f:
+            f.write(rng.randbytes(256))
+    with open(os.path.join(workdir, "word_to_media.json"), "w", encoding="utf-8") as f:
+        json.dump({word: f"{word}.mp4" for word in words}, f)
+    with open(os.path.join(workdir, "word_to_gif.json"), "w", encoding="utf-8") as f:
+        json.dump({}, f)
+    for name in ("common_words.txt", "synonyms.json"):
+        shutil.copy(os.path.join(ROOT, name), workdir)
+    return words
+
+
+class StubPipeline:
+    """Deterministic stand-in for the transformers pipeline: echoes each prompt's text."""
+
+    def __init__(self, latency_ms=0.0):
+        self.latency = latency_ms / 1000
+
+    def __call__(self, prompts, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        return [{"generated_text": prompt.split(": ", 1)[-1]} for prompt in prompts]
+
+
+def make_corpus(words, rng):
+    def sentence(length, unknown_share=0.0):
+        tokens = []
+        for _ in range(length):
+            roll = rng.random()
+            if roll < unknown_share:
+                tokens.append("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(6, 12))))
+            elif roll < unknown_share + 0.3:
+                tokens.append(rng.choice(FILLERS))
+            else:
+                tokens.append(rng.choice(words))
+        return " ".join(tokens).capitalize() + "."
+
+    return {
+        "short": [sentence(rng.randint(3, 6)) for _ in range(200)],
+        "long": [sentence(rng.randint(40, 60)) for _ in range(50)],
+        "fingerspell": [sentence(rng.randint(4, 8), unknown_share=0.8) for _ in range(100)],
+    }
+
+
+# --- measurement ---
+
+def measure(fn, inputs, seconds, before=None):
+    # One pass over the inputs first: caches that should be warm in steady state are warm
+    # before timing starts (the `before` hook still empties the ones a case measures cold)
+    for i in range(min(len(inputs), 200)):
+        if before:
+            before()
+        fn(inputs[i % len(inputs)])
+
+    samples = []
+    deadline = time.perf_counter() + seconds
+    i = 0
+    while time.perf_counter() < deadline or len(samples) < 20:
+        if before:
+            before()
+        text = inputs[i % len(inputs)]
+        started = time.perf_counter_ns()
+        fn(text)
+        samples.append(time.perf_counter_ns() - started)
+        i += 1
+
+    samples.sort()
+    return {
+        "ops_per_sec": round(1e9 / statistics.fmean(samples), 1),
+        "p50_us": round(samples[len(samples) // 2] / 1000, 2),
+        "p99_us": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))] / 1000, 2),
+        "samples": len(samples),
+    }
+
+
+def run_suite(args):
+    rng = random.Random(args.seed)
+    workdir = tempfile.mkdtemp(prefix="hot-path-")
+    cwd = os.getcwd()
+    try:
+        words = build_media_tree(workdir, args.clips, rng)
+        os.chdir(workdir)
+        os.environ.update(
+            ASL_WARMUP="0", ASL_USE_AI="1", PREFETCH_ENABLED="0", ASL_GLOSS_CACHE_DB="", ASL_LOG_SAMPLE_RATE="0",
+            MEDIA_METADATA_FILE=os.path.join(workdir, "media_metadata.json"),
+        )
+
+        import rule_engine
+        try:
+            rule_engine.lemmatize("running")
+            lemmatizer = "wordnet"
+        except LookupError:
+            print("⚠️ NLTK WordNet data missing: using an identity lemmatizer.")
+            rule_engine.lemmatize = lambda word: word
+            lemmatizer = "identity"
+
+        import app
+        import grammar_convert
+        from finger_spelling import get_fingerspelling_paths
+        from media_index import media_index
+
+        rule_engine.build_lemma_table(media_index.vocabulary())
+        grammar_convert.asl_pipe = StubPipeline(args.stub_latency_ms)
+        grammar_convert.model_state = "ready"
+        clear_cache = grammar_convert.gloss_cache.clear
+
+        corpus = make_corpus(words, rng)
+        glossed = {name: [rule_engine.convert(text) for text in texts] for name, texts in corpus.items()}
+        spelled_words = [word.strip(".").lower() for text in corpus["fingerspell"] for word in text.split()]
+
+        cases = {
+            "rule_fallback_short": (grammar_convert.apply_rule_based_fallback, corpus["short"], None),
+            "rule_fallback_long": (grammar_convert.apply_rule_based_fallback, corpus["long"], None),
+            "gloss_miss_short": (grammar_convert.convert_to_asl_grammar, corpus["short"], clear_cache),
+            "gloss_hit_short": (grammar_convert.convert_to_asl_grammar, corpus["short"], None),
+            "fingerspell": (get_fingerspelling_paths, spelled_words, None),
+            "resolve_short": (app.pipeline.run_gloss, glossed["short"], None),
+            "resolve_long": (app.pipeline.run_gloss, glossed["long"], None),
+            "pipeline_short": (app.pipeline.run, corpus["short"], clear_cache),
+            "pipeline_long": (app.pipeline.run, corpus["long"], clear_cache),
+            "pipeline_fingerspell": (app.pipeline.run, corpus["fingerspell"], clear_cache),
+        }
+
+        # The per-request prints are part of the code under test but not of interest here
+        results = {}
+        devnull = open(os.devnull, "w")
+        for name, (fn, inputs, before) in cases.items():
+            if args.cases and name not in args.cases:
+                continue
+            stdout, sys.stdout = sys.stdout, devnull
+            try:
+                results[name] = measure(fn, inputs, args.seconds, before=before)
+            finally:
+                sys.stdout = stdout
+            result = results[name]
+            print(f"{name:<22} {result['ops_per_sec']:>12,.0f} ops/s {result['p50_us']:>10.1f} us p50 {result['p99_us']:>10.1f} us p99")
+        devnull.close()
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "config": {
+            "clips": args.clips,
+            "seed": args.seed,
+            "stub_latency_ms": args.stub_latency_ms,
+            "lemmatizer": lemmatizer,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "results": results,
+    }
+
+
+def compare(report, baseline_path, tolerance):
+    """Prints p50 change per case against the baseline; returns the names that regressed."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    for key in ("clips", "lemmatizer", "stub_latency_ms"):
+        if baseline["config"].get(key) != report["config"].get(key):
+            raise SystemExit(f"Baseline was recorded with {key}={baseline['config'].get(key)!r}, "
+                             f"this run used {report['config'].get(key)!r}; re-run with matching options.")
+
+    regressions = []
+    print(f"\nvs {baseline_path} (regression = p50 more than {tolerance:.0%} slower)")
+    for name, result in report["results"].items():
+        before = baseline["results"].get(name)
+        if not before:
+            continue
+        change = result["p50_us"] / before["p50_us"] - 1
+        flag = "❌" if change > tolerance else "✅"
+        print(f"{flag} {name:<22} p50 {before['p50_us']:>9.1f} → {result['p50_us']:>9.1f} us ({change:+.1%})")
+        if change > tolerance:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clips", type=int, default=1000, help="synthetic media files (100 to 100000)")
+    parser.add_argument("--seconds", type=float, default=1.0, help="measuring time per case")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stub-latency-ms", type=float, default=0.0, help="simulated model time per batch")
+    parser.add_argument("--cases", nargs="*", help="only run these cases")
+    parser.add_argument("--save", metavar="PATH", help="write the results as a baseline JSON file")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p50 slowdown before failing")
+    args = parser.parse_args()
+    if not 100 <= args.clips <= 100000:
+        parser.error("--clips must be between 100 and 100000")
+
+    report = run_suite(args)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"saved baseline to {args.save}")
+    if args.compare:
+        return 1 if compare(report, args.compare, args.tolerance) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""
+Cold-start benchmark for the web app.
+
+Measures, in fresh interpreters, how long `import app` takes with lazy loading
+(ASL_WARMUP=0) and how long it takes when the grammar model and NLTK are loaded
+eagerly right after import, which is what the app used to do at import time.
+
+    python benchmarks/import_time.py --runs 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LAZY = "import time; t = time.perf_counter(); import app; print(time.perf_counter() - t)"
+EAGER = (
+    "import time; t = time.perf_counter(); import app, grammar_convert;"
+    " grammar_convert.load_lemmatizer(); grammar_convert.load_model();"
+    " import wikipedia, openai, bs4; print(time.perf_counter() - t)"
+)
+
+
+def time_snippet(snippet, runs):
+    env = dict(os.environ, ASL_WARMUP="0")
+    timings = []
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-c", snippet], cwd=ROOT, env=env, capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(proc.stderr.strip()[-2000:])
+        timings.append(float(proc.stdout.strip().splitlines()[-1]))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    for label, snippet in (("lazy import", LAZY), ("eager (old behaviour)", EAGER)):
+        timings = time_snippet(snippet, args.runs)
+        print(f"{label:<24} median {statistics.median(timings) * 1000:9.1f} ms"
+              f"   min {min(timings) * 1000:9.1f} ms   ({args.runs} runs)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
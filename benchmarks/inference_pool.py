@@ -0,0 +1,140 @@
+"""
+Memory and throughput of the shared inference pool, per configuration.
+
+For every "<workers>x<torch threads>" configuration the pool is started twice: once
+with the model preloaded in the parent and shared copy-on-write by the forked workers,
+once with --no-preload, where each worker loads its own copy (what running several
+web workers with an in-process model amounts to). Memory is summed over the pool's
+processes as RSS (counts shared pages once per process) and PSS (splits shared pages
+between the processes that map them, so it is the real footprint). Throughput comes
+from `--clients` threads sending `--batch`-sized prompt batches for `--seconds`.
+
+Linux only (reads /proc). Requires the grammar model's dependencies.
+
+    python benchmarks/inference_pool.py --configs 1x4,2x2,4x1 --clients 4 --seconds 20
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from inference_pool import InferencePoolClient  # noqa: E402
+
+CORPUS = [
+    "hello how are you",
+    "what is your name",
+    "I am going to school tomorrow",
+    "my brother is playing football",
+    "the dog is barking at the cat",
+    "I want to drink water",
+    "where do you live",
+    "she likes to eat pizza with her friends",
+]
+
+
+def process_tree(pid):
+    pids = [pid]
+    for task in os.listdir(f"/proc/{pid}/task"):
+        try:
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                pids.extend(descendant for child in f.read().split() for descendant in process_tree(int(child)))
+        except OSError:
+            pass
+    return pids
+
+
+def memory_mb(pid):
+    """(RSS, PSS) in MB summed over `pid` and its descendants."""
+    rss = pss = 0
+    for member in process_tree(pid):
+        try:
+            with open(f"/proc/{member}/smaps_rollup") as f:
+                for line in f:
+                    if line.startswith("Rss:"):
+                        rss += int(line.split()[1])
+                    elif line.startswith("Pss:"):
+                        pss += int(line.split()[1])
+        except OSError:
+            pass
+    return rss / 1024, pss / 1024
+
+
+def load(client, clients, batch, seconds):
+    prompts = [f"Convert to ISL grammar: {CORPUS[i % len(CORPUS)]}" for i in range(batch)]
+    latencies = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def worker():
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            client(prompts, batch_size=batch, max_new_tokens=50, do_sample=False)
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=worker) for _ in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return len(latencies) * batch / elapsed, p50, p99
+
+
+def run_config(workers, threads, preload, args, socket_path):
+    command = [sys.executable, "inference_pool.py", "--socket", socket_path,
+               "--workers", str(workers), "--torch-threads", str(threads)]
+    if not preload:
+        command.append("--no-preload")
+    pool = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.DEVNULL)
+    try:
+        client = InferencePoolClient(socket_path, timeout=args.timeout)
+        client.wait_ready(timeout=args.timeout)
+        client(["Convert to ISL grammar: hello"], max_new_tokens=50, do_sample=False)
+        # With --no-preload the other workers may still be loading: wait for memory to settle
+        rss, pss = memory_mb(pool.pid)
+        while True:
+            time.sleep(2)
+            previous, (rss, pss) = pss, memory_mb(pool.pid)
+            if abs(pss - previous) < 0.01 * pss:
+                break
+        rate, p50, p99 = load(client, args.clients, args.batch, args.seconds)
+        return rss, pss, rate, p50, p99
+    finally:
+        pool.terminate()
+        pool.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--configs", default="1x4,2x2,4x1", help="comma-separated <workers>x<torch threads>")
+    parser.add_argument("--clients", type=int, default=4, help="concurrent client threads (web workers)")
+    parser.add_argument("--batch", type=int, default=4, help="prompts per request")
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--timeout", type=float, default=300, help="seconds to wait for model load / one batch")
+    args = parser.parse_args()
+
+    print(f"{'config':>8} {'weights':>9} {'RSS MB':>9} {'PSS MB':>9} {'prompts/s':>10} {'p50 ms':>9} {'p99 ms':>9}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for config in args.configs.split(","):
+            workers, threads = (int(part) for part in config.split("x"))
+            for preload in (True, False):
+                socket_path = os.path.join(workdir, f"pool-{config}-{int(preload)}.sock")
+                rss, pss, rate, p50, p99 = run_config(workers, threads, preload, args, socket_path)
+                print(f"{config:>8} {'shared' if preload else 'copied':>9} {rss:>9.0f} {pss:>9.0f}"
+                      f" {rate:>10.1f} {p50 * 1000:>9.0f} {p99 * 1000:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Throughput of the rule-based gloss fallback: the previous NLTK implementation
+(re.sub + word_tokenize + two WordNet lookups per token) against rule_engine's
+fast path, single-sentence and batched. Also checks both produce identical glosses.
+
+Requires the NLTK 'wordnet' and 'punkt' data.
+
+    python benchmarks/rule_fallback_throughput.py --sentences 2000
+"""
+import argparse
+import functools
+import os
+import random
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import rule_engine  # noqa: E402
+from media_index import media_index  # noqa: E402
+
+SENTENCES = [
+    "Hello, how are you doing today?",
+    "What is your name?",
+    "I am going to school tomorrow with my brother.",
+    "The dogs were barking at the cats all night.",
+    "She likes eating pizza and drinking tea.",
+    "We are learning Indian sign language together.",
+    "They cannot come because they are tired.",
+    "My mother bought new shoes for the children.",
+    "Artificial intelligence is changing the world quickly.",
+    "I wanna watch a movie, but I gotta do my homework first.",
+]
+
+
+def legacy_rule_based_fallback(text, lemmatizer, word_tokenize):
+    """The implementation rule_engine replaced, kept here as the reference."""
+    cleaned_text = re.sub(r'[^\w\s]', '', text)
+    words = word_tokenize(cleaned_text.lower())
+
+    filtered_words = []
+    for word in words:
+        if word not in rule_engine.removable_words:
+            base_word = lemmatizer.lemmatize(word, pos='v')
+            if base_word == word:
+                base_word = lemmatizer.lemmatize(word)
+            filtered_words.append(base_word.upper())
+    return ' '.join(filtered_words)
+
+
+def throughput(label, fn, corpus, batch=False):
+    started = time.perf_counter()
+    if batch:
+        fn(corpus)
+    else:
+        for text in corpus:
+            fn(text)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {len(corpus) / elapsed:>12,.0f} sentences/s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sentences", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    from nltk.stem import WordNetLemmatizer
+    from nltk.tokenize import word_tokenize
+    legacy_fn = functools.partial(
+        legacy_rule_based_fallback, lemmatizer=WordNetLemmatizer(), word_tokenize=word_tokenize
+    )
+
+    rng = random.Random(args.seed)
+    corpus = [rng.choice(SENTENCES) for _ in range(args.sentences)]
+
+    mismatches = [
+        (text, legacy_fn(text), rule_engine.convert(text))
+        for text in SENTENCES
+        if legacy_fn(text) != rule_engine.convert(text)
+    ]
+    for text, old, new in mismatches:
+        print(f"❌ mismatch on {text!r}: legacy={old!r} fast={new!r}")
+
+    started = time.perf_counter()
+    size = rule_engine.build_lemma_table(media_index.vocabulary())
+    print(f"lemma table: {size} words in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    legacy = throughput("legacy (NLTK per token)", legacy_fn, corpus)
+    fast = throughput("rule_engine.convert", rule_engine.convert, corpus)
+    throughput("rule_engine.convert_many", rule_engine.convert_many, corpus, batch=True)
+    print(f"speed-up (single): {legacy / fast:.1f}x")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+from gloss_cache import normalize_text
+
+# --- 1. CONCEPT SUMMARY CACHE ---
+
+class ConceptCache:
+    """
+    Disk-backed cache for concept lookups (GPT / Wikipedia summaries), keyed by normalized query.
+    - Hits are kept for `ttl_seconds`; misses (fetch returned None) for `negative_ttl_seconds`.
+    - Concurrent lookups of the same query share a single upstream call (single-flight).
+    - Exceptions raised by the fetch function are passed to every waiter and never cached.
+    - Expired rows are deleted at startup and on every write, so the table does not grow without bound.
+    get_or_fetch_async() is the same for coroutine fetch functions on one event loop (asgi_app.py).
+    """
+
+    def __init__(self, db_path="concept_cache.sqlite3", ttl_seconds=7 * 86400, negative_ttl_seconds=3600):
+        self.db_path = db_path
+        self.ttl_seconds = float(ttl_seconds)
+        self.negative_ttl_seconds = float(negative_ttl_seconds)
+
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._async_in_flight = {}
+        self._db = None
+
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.shared_waits = 0
+
+        try:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS concept_cache ("
+                " query TEXT PRIMARY KEY, payload TEXT, stored_at REAL NOT NULL)"
+            )
+            self._purge_expired()
+            self._db.commit()
+        except sqlite3.Error as e:
+            print(f"⚠️ Concept cache disabled ({db_path}): {e}")
+            self._db = None
+
+    def _read(self, key):
+        """Returns (found, value). A found entry with value None is a cached miss."""
+        if self._db is None:
+            return False, None
+        with self._lock:
+            row = self._db.execute(
+                "SELECT payload, stored_at FROM concept_cache WHERE query = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return False, None
+
+        payload, stored_at = row
+        ttl = self.ttl_seconds if payload is not None else self.negative_ttl_seconds
+        if time.time() - stored_at > ttl:
+            return False, None
+        return True, (json.loads(payload) if payload is not None else None)
+
+    def _purge_expired(self):
+        """Deletes hits older than ttl_seconds and misses older than negative_ttl_seconds (caller commits)."""
+        now = time.time()
+        self._db.execute(
+            "DELETE FROM concept_cache WHERE stored_at < CASE WHEN payload IS NULL THEN ? ELSE ? END",
+            (now - self.negative_ttl_seconds, now - self.ttl_seconds),
+        )
+
+    def _write(self, key, value):
+        if self._db is None:
+            return
+        payload = json.dumps(value) if value is not None else None
+        with self._lock:
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO concept_cache (query, payload, stored_at) VALUES (?, ?, ?)",
+                    (key, payload, time.time()),
+                )
+                self._purge_expired()
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"⚠️ Concept cache write failed: {e}")
+
+    def _cached(self, key):
+        found, value = self._read(key)
+        if found:
+            if value is None:
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+        return found, value
+
+    def get_or_fetch(self, query, fetch):
+        """Returns the cached result for `query`, calling `fetch(query)` at most once per key on a miss."""
+        key = normalize_text(query)
+
+        found, value = self._cached(key)
+        if found:
+            return value
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+
+        if not leader:
+            self.shared_waits += 1
+            return future.result()
+
+        self.misses += 1
+        try:
+            value = fetch(query)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            self._write(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    async def get_or_fetch_async(self, query, fetch):
+        """Async get_or_fetch: awaits `fetch(query)` at most once per key across concurrent requests."""
+        key = normalize_text(query)
+
+        found, value = self._cached(key)
+        if found:
+            return value
+
+        future = self._async_in_flight.get(key)
+        if future is not None:
+            self.shared_waits += 1
+            # shield: a waiter whose client disconnects must not cancel the shared lookup
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._async_in_flight[key] = future
+        self.misses += 1
+        try:
+            value = await fetch(query)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception() # retrieved here, so no "never retrieved" warning without waiters
+            raise
+        else:
+            self._write(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            self._async_in_flight.pop(key, None)
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "shared_waits": self.shared_waits,
+            "in_flight": len(self._in_flight) + len(self._async_in_flight),
+        }
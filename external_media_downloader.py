@@ -1,7 +1,8 @@
-import requests
 import os
-from bs4 import BeautifulSoup
 import time # For polite scraping (delaying requests)
+from mapping_writer import MappingWriter
+from media_index import media_index
+from media_store import MediaStore
 
 MEDIA_FOLDER = "media"
 # IMPORTANT: You must identify a single, reliable online dictionary 
@@ -10,6 +11,10 @@ MEDIA_FOLDER = "media"
 # Replace this with the base URL of your chosen dictionary.
 BASE_SIGN_DICTIONARY_URL = "https://example-sign-dictionary.org" 
 
+# Downloads are stored by content hash and mapped from the gloss word in word_to_media.json
+media_store = MediaStore(MEDIA_FOLDER)
+mapping_writer = MappingWriter("word_to_media.json")
+
 
 def scrape_sign_video_url(word):
     """
@@ -18,6 +23,10 @@ def scrape_sign_video_url(word):
     NOTE: This is the most challenging part, as it requires specific knowledge
     of the target website's HTML structure. The code below is a TEMPLATE.
     """
+    # Scraper dependencies are imported here so importing this module stays cheap
+    import requests
+    from bs4 import BeautifulSoup
+
     search_url = f"{BASE_SIGN_DICTIONARY_URL}/search?q={word}"
     
     try:
@@ -53,6 +62,8 @@ def download_sign_media(word_gloss):
     Searches for the video URL and downloads it to the local media folder.
     Returns the local path if successful, None otherwise.
     """
+    import requests
+
     # 1. Search for the direct video URL
     video_url = scrape_sign_video_url(word_gloss.lower()) 
     
@@ -60,20 +71,21 @@ def download_sign_media(word_gloss):
         print(f"❌ No suitable video URL found online for {word_gloss}")
         return None
         
-    local_filename = f"{word_gloss.upper()}.mp4"
-    local_path = os.path.join(MEDIA_FOLDER, local_filename)
-    
     # 2. Download the video file
     try:
-        # Use stream=True for large files
+        # Use stream=True for large files; hashed while streaming, stored once per content
         response = requests.get(video_url, stream=True, timeout=20) 
         response.raise_for_status() 
+        local_filename, stored = media_store.ingest(response.iter_content(chunk_size=8192), "mp4")
+        local_path = os.path.join(MEDIA_FOLDER, local_filename)
 
-        with open(local_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-                
-        print(f"✅ SUCCESSFULLY CACHED: {local_filename}")
+        # Map the gloss word (as the old <WORD>.mp4 name did), then make the clip visible
+        # to lookups without waiting for a folder re-scan
+        mapping_writer.update(word_gloss.upper(), local_filename)
+        mapping_writer.flush()
+        media_index.add(local_filename)
+        note = "" if stored else " (same clip as an existing sign)"
+        print(f"✅ SUCCESSFULLY CACHED: {word_gloss.upper()} → {local_filename}{note}")
         return local_path
         
     except requests.exceptions.RequestException as e:
@@ -1,7 +1,12 @@
-import os
+from fingerspell_atlas import fingerspell_atlas
+from media_index import media_index
+from metrics import log_sampled, timed
 
-MEDIA_FOLDER = "media"
+def fingerspelling_letters(word):
+    """The letters a word is spelled with: uppercased, non-alphabetic characters removed."""
+    return "".join(filter(str.isalpha, word.upper()))
 
+@timed("fingerspell")
 def get_fingerspelling_paths(word):
     """
     Converts a word into a list of media paths for each letter's sign video.
@@ -9,22 +14,29 @@ def get_fingerspelling_paths(word):
     """
     paths = []
     # Ensure the word is uppercase and remove any non-alphabetic characters
-    clean_word = "".join(filter(str.isalpha, word.upper()))
+    clean_word = fingerspelling_letters(word)
     
     if not clean_word:
         return []
         
     for letter in clean_word:
         # Construct the expected filename: 'C.mp4', 'H.mp4', etc.
-        media_file = f"{letter}.mp4"
-        media_path = os.path.join(MEDIA_FOLDER, media_file)
+        media_file = media_index.letter_file(letter)
 
-        # Check if the video for the letter exists locally
-        if os.path.exists(media_path):
-            paths.append(f"/media/{media_file}")
+        # Check the in-memory media index for the letter's video
+        if media_file:
+            paths.append(media_index.url_for(media_file))
         else:
             # If a letter sign is missing (e.g., you don't have 'Q.mp4'), stop the sequence
-            print(f"⚠️ Fingerspelling failed: Video not found for letter: {letter}. Skipping word.")
+            log_sampled("letter_missing", "⚠️ Fingerspelling failed: Video not found for letter: %s. Skipping word.", letter)
             return [] 
             
-    return paths
\ No newline at end of file
+    return paths
+
+def get_fingerspelling_atlas(word):
+    """
+    The same spelling as one alphabet atlas clip: {"url", "segments": [[start, end], ...]}
+    with one (start, end) in seconds per letter, or None while no atlas covers every letter.
+    """
+    clean_word = fingerspelling_letters(word)
+    return fingerspell_atlas.spell(clean_word) if clean_word else None
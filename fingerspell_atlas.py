@@ -0,0 +1,172 @@
+import argparse
+import hashlib
+import json
+import math
+import os
+import string
+import tempfile
+import threading
+import time
+
+from atomic_files import match_file_mode
+from media_index import media_index as default_media_index
+from media_metadata import media_metadata as default_media_metadata
+from sequence_render import SEQUENCE_FPS, SEQUENCE_HEIGHT, SEQUENCE_WIDTH, SequenceRenderError, join_clips
+
+# --- 1. SETTINGS ---
+
+ATLAS_FOLDER = os.path.join("media_cache", "atlas")
+# Every letter sign, in atlas order. Only letters: fingerspelling drops everything else
+# (see finger_spelling.fingerspelling_letters), so digit tiles could never be used
+ATLAS_SYMBOLS = tuple(string.ascii_uppercase)
+# While no atlas is found, workers look for one built by another process this often (seconds)
+RECHECK_SECONDS = 30.0
+
+# --- 2. ATLAS ---
+
+class FingerspellAtlas:
+    """
+    All letter signs rendered back to back into one MP4, plus an index of where
+    each sign starts and ends in it. A fingerspelled word is then one cached download and
+    a list of (start, end) segments, instead of one fetch and one element swap per letter.
+
+    The atlas is named after a hash of its source clips and the render settings, so a
+    changed letter clip gives a new file name (and the URL can be cached forever). It is
+    rendered off the request path, by start_build() or `python fingerspell_atlas.py`;
+    until it exists, spell() returns None and fingerspelling keeps its per-letter URLs.
+    """
+
+    def __init__(self, media_index=default_media_index, media_metadata=default_media_metadata, folder=ATLAS_FOLDER):
+        self.media_index = media_index
+        self.media_metadata = media_metadata
+        self.folder = folder
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._index = None
+        self._generation = None
+        self._checked_at = 0.0
+
+    def _sources(self):
+        """(symbol, filename, duration) for every letter with an MP4 clip of known length (see MediaIndex.letter_file)."""
+        sources = []
+        for symbol in ATLAS_SYMBOLS:
+            filename = self.media_index.letter_file(symbol)
+            if not filename or not filename.endswith(".mp4"):
+                continue
+            info = self.media_metadata.get(filename)
+            if info and info.get("duration"):
+                sources.append((symbol, filename, info["duration"]))
+        return sources
+
+    def _key(self, sources):
+        digest = hashlib.sha256(f"{SEQUENCE_WIDTH}x{SEQUENCE_HEIGHT}@{SEQUENCE_FPS}".encode("utf-8"))
+        for symbol, filename, _ in sources:
+            digest.update(f"\n{symbol}={filename}:{self.media_index.fingerprint(filename)}".encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+    def _load(self, key):
+        index_path = os.path.join(self.folder, f"alphabet-{key}.json")
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not os.path.exists(os.path.join(self.folder, index.get("file", ""))):
+            return None
+        return index
+
+    def current(self):
+        """Index ({"file", "fps", "duration", "segments": {symbol: [start, end]}}) of the atlas for the current clips, or None."""
+        generation = self.media_index.generation
+        if generation != self._generation or (self._index is None and time.monotonic() - self._checked_at > RECHECK_SECONDS):
+            with self._lock:
+                if generation != self._generation or self._index is None:
+                    self._index = self._load(self._key(self._sources()))
+                    self._generation = generation
+                    self._checked_at = time.monotonic()
+        return self._index
+
+    def spell(self, symbols):
+        """{"url", "segments": [[start, end], ...]} for the symbols in order, or None (no atlas, or a symbol not in it)."""
+        index = self.current()
+        if index is None:
+            return None
+        segments = index["segments"]
+        try:
+            return {"url": f"/atlas/{index['file']}", "segments": [segments[symbol] for symbol in symbols]}
+        except KeyError:
+            return None
+
+    def build(self):
+        """Renders the atlas for the current clips unless it already exists. Returns its index; raises SequenceRenderError."""
+        with self._build_lock:
+            self.media_index.refresh()
+            sources = self._sources()
+            if not sources:
+                raise SequenceRenderError("No letter clips to build an atlas from.")
+            key = self._key(sources)
+            index = self._load(key)
+            if index is None:
+                index = self._render(key, sources)
+            with self._lock:
+                self._index = index
+                self._generation = self.media_index.generation
+            return index
+
+    def _render(self, key, sources):
+        os.makedirs(self.folder, exist_ok=True)
+        video_file = f"alphabet-{key}.mp4"
+        # Every sign is cut to a whole number of frames, so its offsets in the atlas are exact
+        frames = [max(1, round(duration * SEQUENCE_FPS)) for _, _, duration in sources]
+        join_clips([filename for _, filename, _ in sources], os.path.join(self.folder, video_file), frames)
+
+        segments = {}
+        position = 0
+        for (symbol, _, _), count in zip(sources, frames):
+            # Rounded inwards to the millisecond: a seek to `start` lands on the sign's first frame, never the previous one
+            segments[symbol] = [math.ceil(position / SEQUENCE_FPS * 1000) / 1000,
+                                math.floor((position + count) / SEQUENCE_FPS * 1000) / 1000]
+            position += count
+        index = {"file": video_file, "fps": SEQUENCE_FPS, "duration": round(position / SEQUENCE_FPS, 3), "segments": segments}
+
+        # The index is written last: its presence means the atlas is complete
+        fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=self.folder)
+        try:
+            match_file_mode(fd)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(index, f, separators=(",", ":"))
+            os.replace(temp_path, os.path.join(self.folder, f"alphabet-{key}.json"))
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        # Atlases for earlier versions of the letter clips are no longer referenced
+        for filename in os.listdir(self.folder):
+            if filename.startswith("alphabet-") and not filename.startswith(f"alphabet-{key}."):
+                os.remove(os.path.join(self.folder, filename))
+
+        print(f"✅ Built fingerspelling atlas {video_file}: {len(sources)} signs, {index['duration']}s.")
+        return index
+
+    def start_build(self):
+        """Builds the atlas in a background thread if it is missing (e.g. at startup)."""
+        def build():
+            try:
+                if self.current() is None:
+                    self.build()
+            except SequenceRenderError as e:
+                print(f"⚠️ Fingerspelling atlas unavailable, using per-letter clips: {e}")
+        thread = threading.Thread(target=build, name="fingerspell-atlas", daemon=True)
+        thread.start()
+        return thread
+
+
+# Process-wide atlas shared by fingerspelling and the routes
+fingerspell_atlas = FingerspellAtlas()
+
+if __name__ == "__main__":
+    # Offline build: python fingerspell_atlas.py
+    parser = argparse.ArgumentParser(description="Render every letter sign into one atlas clip with a time-offset index.")
+    parser.parse_args()
+    index = fingerspell_atlas.build()
+    print(f"✅ {os.path.join(ATLAS_FOLDER, index['file'])}: {', '.join(index['segments'])}")
@@ -0,0 +1,122 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# --- 1. KEY NORMALIZATION ---
+
+def normalize_text(text):
+    """Case- and whitespace-insensitive cache key for an input sentence."""
+    return " ".join(text.lower().split())
+
+# --- 2. LRU CACHE WITH OPTIONAL SQLITE PERSISTENCE ---
+
+class GlossCache:
+    """
+    Bounded LRU cache for English → gloss conversions, keyed on (mode, normalized text).
+    Entries older than `ttl_seconds` are treated as misses (ttl_seconds=0 disables expiry).
+    If `db_path` is given, entries are written through to SQLite and the most recent
+    ones are loaded back on startup, so a restart begins with a warm cache.
+    """
+
+    def __init__(self, max_entries=1024, ttl_seconds=86400, db_path=None):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = float(ttl_seconds)
+        self.db_path = db_path
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if db_path:
+            self._open_db()
+
+    def _open_db(self):
+        try:
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS gloss_cache ("
+                " mode TEXT NOT NULL, text TEXT NOT NULL, gloss TEXT NOT NULL,"
+                " stored_at REAL NOT NULL, PRIMARY KEY (mode, text))"
+            )
+            self._db.commit()
+            rows = self._db.execute(
+                "SELECT mode, text, gloss, stored_at FROM gloss_cache"
+                " ORDER BY stored_at DESC LIMIT ?",
+                (self.max_entries,),
+            ).fetchall()
+        except sqlite3.Error as e:
+            print(f"⚠️ Gloss cache persistence disabled ({self.db_path}): {e}")
+            self._db = None
+            return
+
+        # Oldest first, so the most recent entries end up at the MRU end
+        for mode, text, gloss, stored_at in reversed(rows):
+            if not self._expired(stored_at):
+                self._entries[(mode, text)] = (gloss, stored_at)
+
+    def _expired(self, stored_at):
+        return self.ttl_seconds > 0 and time.time() - stored_at > self.ttl_seconds
+
+    def get(self, mode, text):
+        key = (mode, normalize_text(text))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self._expired(entry[1]):
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, mode, text, gloss):
+        key = (mode, normalize_text(text))
+        stored_at = time.time()
+        with self._lock:
+            self._entries[key] = (gloss, stored_at)
+            self._entries.move_to_end(key)
+
+            evicted = []
+            while len(self._entries) > self.max_entries:
+                evicted.append(self._entries.popitem(last=False)[0])
+            self.evictions += len(evicted)
+
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO gloss_cache (mode, text, gloss, stored_at)"
+                        " VALUES (?, ?, ?, ?)",
+                        (key[0], key[1], gloss, stored_at),
+                    )
+                    if evicted:
+                        self._db.executemany(
+                            "DELETE FROM gloss_cache WHERE mode = ? AND text = ?", evicted
+                        )
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    print(f"⚠️ Gloss cache write failed: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM gloss_cache")
+                self._db.commit()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "persistent": self._db is not None,
+        }
@@ -0,0 +1,173 @@
+import json
+import os
+import threading
+from collections import namedtuple
+
+import rule_engine
+from media_store import is_content_addressed
+
+SYNONYMS_FILE = "synonyms.json"
+
+# One resolved span of the gloss: the tokens it covers, the clip (None → fingerspell) and the tier used
+Resolution = namedtuple("Resolution", ["tokens", "media_file", "tier"])
+
+# Remembered token → (clip, tier) matches; dropped whenever the media index changes
+MATCH_CACHE_SIZE = 8192
+
+# --- 1. RESOLVER ---
+
+class GlossResolver:
+    """
+    Maps gloss tokens to media clips, trying progressively looser matches before giving up:
+      phrase  - longest multi-word match first (e.g. GOOD MORNING → goodmorning.mp4), via a token trie
+      exact   - the media index's own lookup (lexicon, then '<TOKEN>.mp4')
+      case    - case-insensitive match in the lexicon, then against word-named media files
+      lemma   - the token's lemma (PLAYING → play), or any lexicon word sharing it (PLAYED → playing)
+      synonym - synonyms.json (single-word entries)
+    Single tokens are looked up in the lexicon (indexed SQLite) and the matches remembered;
+    the phrase trie, file-name table and remembered matches are rebuilt when the media index changes.
+    """
+
+    def __init__(self, media_index, lexicon=None, language=None, synonyms_file=SYNONYMS_FILE):
+        self.media_index = media_index
+        self.lexicon = lexicon or media_index.lexicon
+        self.language = language or media_index.language
+        self.synonyms_file = synonyms_file
+        self._lock = threading.Lock()
+        self._generation = None
+        self._stems = {}
+        self._matches = {}
+        self._synonyms = {}
+        self._trie = {}
+        self._max_phrase = 1
+
+    def _load_synonyms(self):
+        try:
+            with open(self.synonyms_file, "r", encoding="utf-8") as f:
+                return {key.lower(): value.lower() for key, value in json.load(f).items()}
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Synonym table not loaded ({self.synonyms_file}): {e}")
+            return {}
+
+    def _build(self):
+        files = self.media_index.files()
+
+        # Lowercase stem → word-named file (hello.mp4), for clips not in the lexicon.
+        # Exact-lowercase file names win over other casings (c.mp4 over C.mp4)
+        stems = {}
+        for filename in sorted(files, key=lambda name: name != name.lower()):
+            if not is_content_addressed(filename): # hashed names are reached through the lexicon only
+                stems.setdefault(os.path.splitext(filename)[0].lower(), filename)
+        self._stems = stems
+        self._matches = {}
+
+        synonyms = self._load_synonyms()
+
+        # Token trie over every multi-word key (file names, lexicon phrases and synonym phrases)
+        trie, max_phrase = {}, 1
+        phrases = {key: filename for key, filename in stems.items() if " " in key}
+        phrases.update((key, filename) for key, filename in self.lexicon.phrases(self.language) if filename in files)
+        for key, target in synonyms.items():
+            # A phrase whose target is one of its own words would drop the others (GOOD DAY → DAY)
+            if " " in key and target not in key.split():
+                filename = self._by_key(target)
+                if filename:
+                    phrases[key] = filename
+        for phrase, filename in phrases.items():
+            tokens = phrase.split()
+            node = trie
+            for token in tokens:
+                node = node.setdefault(token, {})
+            node[None] = filename
+            max_phrase = max(max_phrase, len(tokens))
+
+        self._synonyms = {key: target for key, target in synonyms.items() if " " not in key}
+        self._trie = trie
+        self._max_phrase = max_phrase
+
+    def _ensure_built(self):
+        generation = self.media_index.generation
+        if generation != self._generation:
+            with self._lock:
+                if generation != self._generation:
+                    self._build()
+                    self._generation = generation
+
+    def _match_phrase(self, lowered, start):
+        """Longest phrase starting at `start`. Returns (length, filename) or (0, None)."""
+        node, best = self._trie, (0, None)
+        for i in range(start, min(len(lowered), start + self._max_phrase)):
+            node = node.get(lowered[i])
+            if node is None:
+                break
+            if None in node:
+                best = (i - start + 1, node[None])
+        return best
+
+    def _lemma(self, word):
+        try:
+            return rule_engine.lemma_table.get(word) or rule_engine.lemmatize(word)
+        except LookupError:
+            # NLTK wordnet data not installed: skip the lemma tier
+            return word
+
+    def _first_file(self, candidates):
+        files = self.media_index.files()
+        return next((filename for filename in candidates if filename in files), None)
+
+    def _by_key(self, lowered):
+        """Clip for a lowercase word: lexicon entries in any casing, then word-named files."""
+        return self._first_file(self.lexicon.media_by_key(lowered, self.language)) or self._stems.get(lowered)
+
+    def _lookup(self, token):
+        media_file = self.media_index.media_for(token)
+        if media_file:
+            return media_file, "exact"
+
+        lowered = token.lower()
+        media_file = self._by_key(lowered)
+        if media_file:
+            return media_file, "case"
+
+        lemma = self._lemma(lowered)
+        if lemma != lowered:
+            media_file = self._by_key(lemma) or self._first_file(self.lexicon.media_by_lemma(lemma, self.language))
+            if media_file:
+                return media_file, "lemma"
+
+        for candidate in (lowered, lemma):
+            target = self._synonyms.get(candidate)
+            media_file = target and self._by_key(target)
+            if media_file:
+                return media_file, "synonym"
+
+        return None, None
+
+    def _match_token(self, token):
+        matches = self._matches
+        match = matches.get(token)
+        if match is None:
+            match = self._lookup(token)
+            if len(matches) >= MATCH_CACHE_SIZE:
+                matches.clear()
+            matches[token] = match
+        return match
+
+    def resolve(self, tokens):
+        """Resolves a gloss token list into a list of Resolution spans, in order."""
+        self._ensure_built()
+        lowered = [token.lower() for token in tokens]
+        resolutions = []
+
+        i = 0
+        while i < len(tokens):
+            length, media_file = self._match_phrase(lowered, i) if self._trie else (0, None)
+            if length > 1:
+                resolutions.append(Resolution(tokens[i:i + length], media_file, "phrase"))
+                i += length
+                continue
+
+            media_file, tier = self._match_token(tokens[i])
+            resolutions.append(Resolution(tokens[i:i + 1], media_file, tier))
+            i += 1
+        return resolutions
@@ -1,76 +1,223 @@
-from transformers import pipeline
-from nltk.stem import WordNetLemmatizer
-from nltk.tokenize import word_tokenize 
-import re 
+import logging
+import os
+import threading
+import time
+from batch_inference import MicroBatcher
+from gloss_cache import GlossCache
+from inference_backends import ASL_INFERENCE_BACKEND, load_backend
+from inference_pool import ASL_POOL_SOCKET, InferencePoolClient
+from metrics import log_sampled, operation_errors, operation_seconds, span
+import rule_engine
+from rule_engine import load_lemmatizer, removable_words # re-exported for existing callers
 # import nltk # Uncomment these lines if NLTK data (punkt, wordnet) is missing
 # nltk.download('wordnet')
 # nltk.download('punkt')
 
 # --- 1. INITIAL SETUP ---
+# Nothing heavy happens at import: the FLAN-T5 pipeline and the NLTK lemmatizer are
+# loaded on first use, or ahead of time by start_warmup() in a background thread.
+
+# Set ASL_USE_AI=0 to run rule-based only and never load the model
+USE_AI = os.getenv("ASL_USE_AI", "1") != "0"
+
+asl_pipe = None
+model_state = "unloaded" # unloaded -> loading -> ready | failed | unavailable (pool not reachable yet)
+_model_lock = threading.Lock()
+# Backend that produces the model's glosses; with a pool, the one the pool reports
+model_backend = ASL_INFERENCE_BACKEND
+
+# An unreachable inference pool is retried in the background, waiting this long (seconds)
+# after the first failure and doubling up to the maximum; requests use rules meanwhile
+POOL_RETRY_SECONDS = float(os.getenv("ASL_POOL_RETRY_SECONDS", "5"))
+POOL_RETRY_MAX_SECONDS = float(os.getenv("ASL_POOL_RETRY_MAX_SECONDS", "300"))
+_pool_retry_delay = POOL_RETRY_SECONDS
+
+def _load_locked():
+    """Loads the model or connects to the pool; the caller holds _model_lock."""
+    global asl_pipe, model_state, model_backend, _pool_retry_delay
+    model_state = "loading"
+    try:
+        if ASL_POOL_SOCKET:
+            # Shared inference pool (inference_pool.py): this process holds no weights
+            client = InferencePoolClient(ASL_POOL_SOCKET)
+            model_backend = client.wait_ready() # the pool answers the ping with its backend's name
+            asl_pipe = client
+            loaded_from = f"inference pool at {ASL_POOL_SOCKET}"
+        else:
+            # Backend (torch / torch-int8 / onnx) is chosen with ASL_INFERENCE_BACKEND; all run on the CPU
+            asl_pipe = load_backend(ASL_INFERENCE_BACKEND)
+            loaded_from = f"{ASL_INFERENCE_BACKEND} backend"
+        model_state = "ready"
+        _pool_retry_delay = POOL_RETRY_SECONDS
+        print(f"✅ FLAN-T5 model loaded successfully ({loaded_from}).")
+    except Exception as e:
+        asl_pipe = None
+        if ASL_POOL_SOCKET:
+            # The pool may still be starting or being restarted: not a reason to give up for good
+            model_state = "unavailable"
+            print(f"⚠️ Inference pool unavailable, using rule-based fallback; retrying in {_pool_retry_delay:g}s. Error: {e}")
+            retry = threading.Timer(_pool_retry_delay, _retry_pool)
+            retry.daemon = True
+            retry.start()
+            _pool_retry_delay = min(_pool_retry_delay * 2, POOL_RETRY_MAX_SECONDS)
+        else:
+            model_state = "failed"
+            print(f"⚠️ FLAN-T5 failed to load. Only using rule-based fallback. Error: {e}")
+
+def _retry_pool():
+    with _model_lock:
+        if model_state == "unavailable":
+            _load_locked()
+
+def load_model():
+    """Loads the grammar model once (thread-safe) and returns it, or None if it is not available."""
+    with _model_lock:
+        if model_state == "unloaded":
+            _load_locked()
+    return asl_pipe
+
+def start_warmup():
+    """Loads the model and lemmatizer in a background thread so the first request does not pay for it."""
+    def warm():
+        try:
+            from media_index import media_index
+            rule_engine.build_lemma_table(media_index.vocabulary())
+            # Lexicon entries imported without lemmas get them now, not on the first request
+            media_index.lexicon.lemmatize_pending()
+        except LookupError as e:
+            print(f"⚠️ NLTK data missing, rule-based fallback unavailable: {e}")
+        if USE_AI:
+            load_model()
+    thread = threading.Thread(target=warm, name="grammar-warmup", daemon=True)
+    thread.start()
+    return thread
+
+def ai_available():
+    return USE_AI and model_state != "failed"
+
+def cache_mode():
+    """Gloss cache mode: "rules", or "ai:<backend>" since torch and onnx output can differ."""
+    return f"ai:{model_backend}" if ai_available() else "rules"
+
+def is_ready():
+    """True once requests can be served without waiting on a model load."""
+    return not USE_AI or model_state in ("ready", "failed", "unavailable")
+
+# Micro-batching: concurrent requests are grouped into one padded model call
+ASL_BATCH_MAX_SIZE = int(os.getenv("ASL_BATCH_MAX_SIZE", "8"))
+ASL_BATCH_MAX_WAIT_MS = float(os.getenv("ASL_BATCH_MAX_WAIT_MS", "5"))
+
+# Repeated phrases skip the model/lemmatizer. Set ASL_GLOSS_CACHE_DB to a file path to persist entries.
+gloss_cache = GlossCache(
+    max_entries=int(os.getenv("ASL_GLOSS_CACHE_SIZE", "2048")),
+    ttl_seconds=float(os.getenv("ASL_GLOSS_CACHE_TTL", "86400")),
+    db_path=os.getenv("ASL_GLOSS_CACHE_DB") or None,
+)
 
-try:
-    # Setting device=-1 uses the CPU (safe default)
-    asl_pipe = pipeline("text2text-generation", model="google/flan-t5-small", device=-1) 
-    USE_AI = True
-    print("✅ FLAN-T5 model loaded successfully.")
-except Exception as e:
-    asl_pipe = None
-    USE_AI = False
-    print(f"⚠️ FLAN-T5 failed to load. Only using rule-based fallback. Error: {e}")
-
-lemmatizer = WordNetLemmatizer()
-
-# Words to filter out in the rule-based fallback (articles, prepositions, forms of 'to be', etc.)
-removable_words = {
-    'is', 'am', 'are', 'was', 'were', 'be', 'been', 'being',
-    'a', 'an', 'the', 'to', 'of', 'in', 'on', 'at', 'by',
-    'as', 'for', 'about', 'into', 'from', 'that',
-    'this', 'those', 'these', 'just', 'do', 'does', 'did',
-    'have', 'has', 'had', 'having', 'so', 'because',
-    'will', 'would', 'can', 'could', 'should', 'shall', 'may',
-    'might', 'must', 'and', 'or', 'but', 'if', 'than', 'then',
-    'i', 'me', 'you', 'he', 'she', 'it', 'we', 'us', 'they', 'them' 
-}
 
 # --- 2. CONVERSION FUNCTIONS ---
 
 def apply_rule_based_fallback(text):
     """Applies basic filtering, punctuation removal, lemmatization, and outputs ASL Gloss."""
-    cleaned_text = re.sub(r'[^\w\s]', '', text) 
-    words = word_tokenize(cleaned_text.lower())
-    
-    filtered_words = []
-    for word in words:
-        if word not in removable_words:
-            # Lemmatize verbs, then nouns
-            base_word = lemmatizer.lemmatize(word, pos='v') 
-            if base_word == word:
-                 base_word = lemmatizer.lemmatize(word) 
-            filtered_words.append(base_word.upper()) 
-            
-    return ' '.join(filtered_words)
+    # Precompiled tokenizer + precomputed/memoized lemmas (see rule_engine.py)
+    with span("rule_fallback"):
+        return rule_engine.convert(text)
+
+def _generate_gloss_batch(texts):
+    """Runs one padded FLAN-T5 batch and returns the uppercased gloss for each text."""
+    prompts = [f"Convert to ISL grammar: {text}" for text in texts] # Targeting ISL Gloss
+    results = asl_pipe(
+        prompts,
+        batch_size=len(prompts),
+        max_new_tokens=50, # Cleaned up parameter for safe, short output
+        do_sample=False
+    )
+    # A list input gives one result per prompt (a dict, or a one-item list of dicts)
+    return [
+        (result[0] if isinstance(result, list) else result)['generated_text'].strip().upper()
+        for result in results
+    ]
+
+gloss_batcher = MicroBatcher(
+    _generate_gloss_batch,
+    max_batch_size=ASL_BATCH_MAX_SIZE,
+    max_wait_ms=ASL_BATCH_MAX_WAIT_MS,
+    name="flan-t5-batcher",
+)
 
 def convert_to_asl_grammar(text):
     """Converts English text to Sign Gloss using AI (primary) or rules (fallback)."""
     if not text:
         return ""
         
-    if USE_AI:
-        try:
-            prompt = f"Convert to ISL grammar: {text}" # Targeting ISL Gloss
-            result = asl_pipe(
-                prompt, 
-                max_new_tokens=50, # Cleaned up parameter for safe, short output
-                do_sample=False
-            ) 
-            asl_text = result[0]['generated_text'].strip().upper()
-            print("✅ Hugging Face model used:", asl_text)
-            return asl_text
-        except Exception as e:
-            print(f"⚠️ Hugging Face model execution failed: {e}. Falling back to rule-based conversion.")
-            pass
+    mode = cache_mode()
+    cached = gloss_cache.get(mode, text)
+    if cached is not None:
+        return cached
+
+    if mode != "rules":
+        # While the model is still loading (e.g. warm-up), answer with rules instead of waiting
+        if model_state != "loading" and load_model() is not None:
+            try:
+                with span("model_gloss"):
+                    asl_text = gloss_batcher.run(text)
+                log_sampled("model_gloss", "✅ Hugging Face model used: %s", asl_text)
+                gloss_cache.set(f"ai:{model_backend}", text, asl_text)
+                return asl_text
+            except Exception as e:
+                log_sampled("model_failed", "⚠️ Hugging Face model execution failed: %s. Falling back to rule-based conversion.", e,
+                            level=logging.WARNING, rate=1.0)
+        # Falling back to rules: their result may already be cached, under the rules key
+        cached = gloss_cache.get("rules", text)
+        if cached is not None:
+            return cached
 
     # Fallback execution
     asl_text = apply_rule_based_fallback(text)
-    print("❌ Rule-Based Fallback used:", asl_text)
-    return asl_text
\ No newline at end of file
+    log_sampled("rule_fallback", "❌ Rule-Based Fallback used: %s", asl_text)
+    gloss_cache.set("rules", text, asl_text)
+    return asl_text
+
+def convert_many_to_asl_grammar(texts):
+    """
+    Batch version of convert_to_asl_grammar: cache hits are answered directly and all
+    misses are submitted to the model together, so they share padded batches.
+    """
+    results = [""] * len(texts)
+    mode = cache_mode()
+
+    misses = []
+    for i, text in enumerate(texts):
+        if not text:
+            continue
+        cached = gloss_cache.get(mode, text)
+        if cached is not None:
+            results[i] = cached
+        else:
+            misses.append(i)
+
+    if misses and mode != "rules" and model_state != "loading" and load_model() is not None:
+        started = time.perf_counter()
+        futures = list(zip(misses, gloss_batcher.submit_many([texts[i] for i in misses])))
+        misses = []
+        for i, future in futures:
+            try:
+                results[i] = future.result()
+                # Each text's latency counts from the shared submission, as in convert_to_asl_grammar
+                operation_seconds.observe(time.perf_counter() - started, operation="model_gloss")
+                gloss_cache.set(f"ai:{model_backend}", texts[i], results[i])
+            except Exception as e:
+                operation_errors.inc(operation="model_gloss")
+                log_sampled("model_failed", "⚠️ Hugging Face model execution failed: %s. Falling back to rule-based conversion.", e,
+                            level=logging.WARNING, rate=1.0)
+                misses.append(i)
+
+    for i in misses:
+        # Texts first looked up under the model's key may have a cached rule-based gloss
+        cached = gloss_cache.get("rules", texts[i]) if mode != "rules" else None
+        if cached is not None:
+            results[i] = cached
+            continue
+        results[i] = apply_rule_based_fallback(texts[i])
+        gloss_cache.set("rules", texts[i], results[i])
+    return results
@@ -0,0 +1,29 @@
+# Production launcher for the async serving mode:
+#
+#     gunicorn -c gunicorn_asgi.conf.py asgi_app:application
+#
+# Each worker is one uvicorn event loop. I/O-bound requests (GPT, Wikipedia) wait on the loop
+# without holding a thread, so one worker carries many slow concept searches at once; CPU work
+# goes to that worker's inference pool (ASGI_INFERENCE_WORKERS threads). Every worker loads its
+# own copy of the grammar model, so size WEB_CONCURRENCY by memory, not by expected concurrency.
+import os
+
+bind = os.getenv("BIND", f"0.0.0.0:{os.getenv('PORT', '8000')}")
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Not preloaded: the event loop, thread pools and model must be created after the fork
+preload_app = False
+
+# Longer than OPENAI_TIMEOUT + WIKIPEDIA_TIMEOUT plus a cold model load
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = 5
+
+# Recycle workers now and then to cap slow memory growth in long-running model processes
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "5000"))
+max_requests_jitter = 500
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info")
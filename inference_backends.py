@@ -0,0 +1,60 @@
+import os
+
+# --- 1. BACKEND SELECTION ---
+# ASL_INFERENCE_BACKEND picks how the FLAN-T5 grammar model runs on CPU:
+#   "torch"      - full-precision PyTorch (default, original behaviour)
+#   "torch-int8" - PyTorch with int8 dynamic quantization of the Linear layers
+#   "onnx"       - ONNX Runtime via optimum; exports on first use unless ASL_ONNX_MODEL_DIR is set
+# Every backend returns a transformers text2text-generation pipeline, so callers are unchanged.
+
+MODEL_NAME = "google/flan-t5-small"
+BACKENDS = ("torch", "torch-int8", "onnx")
+ASL_INFERENCE_BACKEND = os.getenv("ASL_INFERENCE_BACKEND", "torch").lower()
+ASL_ONNX_MODEL_DIR = os.getenv("ASL_ONNX_MODEL_DIR", "models/flan-t5-small-onnx")
+
+
+def _load_torch(model_name):
+    from transformers import pipeline
+    # Setting device=-1 uses the CPU (safe default)
+    return pipeline("text2text-generation", model=model_name, device=-1)
+
+
+def _load_torch_int8(model_name):
+    import torch
+    from transformers import pipeline
+    asl_pipe = pipeline("text2text-generation", model=model_name, device=-1)
+    asl_pipe.model = torch.quantization.quantize_dynamic(
+        asl_pipe.model, {torch.nn.Linear}, dtype=torch.qint8
+    )
+    return asl_pipe
+
+
+def _load_onnx(model_name):
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    from transformers import AutoTokenizer, pipeline
+
+    if os.path.isdir(ASL_ONNX_MODEL_DIR):
+        model = ORTModelForSeq2SeqLM.from_pretrained(ASL_ONNX_MODEL_DIR)
+        tokenizer = AutoTokenizer.from_pretrained(ASL_ONNX_MODEL_DIR)
+    else:
+        # One-off export; saved so later startups load the ONNX graph directly
+        model = ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True)
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model.save_pretrained(ASL_ONNX_MODEL_DIR)
+        tokenizer.save_pretrained(ASL_ONNX_MODEL_DIR)
+    return pipeline("text2text-generation", model=model, tokenizer=tokenizer)
+
+
+_LOADERS = {
+    "torch": _load_torch,
+    "torch-int8": _load_torch_int8,
+    "onnx": _load_onnx,
+}
+
+
+def load_backend(name=ASL_INFERENCE_BACKEND, model_name=MODEL_NAME):
+    """Builds the grammar-model pipeline for the named backend. Raises ValueError for unknown names."""
+    loader = _LOADERS.get(name)
+    if loader is None:
+        raise ValueError(f"Unknown inference backend '{name}'. Choose one of: {', '.join(BACKENDS)}")
+    return loader(model_name)
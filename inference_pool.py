@@ -0,0 +1,176 @@
+import argparse
+import gc
+import os
+import signal
+import time
+from multiprocessing import get_context
+from multiprocessing.connection import Client, Listener
+
+from inference_backends import ASL_INFERENCE_BACKEND, load_backend
+
+# --- 1. SETTINGS ---
+# A dedicated process pool for the grammar model, shared by every web worker:
+#
+#     python inference_pool.py                      # start the pool (once per host)
+#     ASL_POOL_SOCKET=/tmp/asl-inference.sock gunicorn -w 4 app:app
+#
+# The model is loaded once in the pool's parent process, which then forks the workers:
+# the weights are shared copy-on-write instead of being loaded into every web worker.
+# Web workers send prompt batches over a Unix socket; with ASL_POOL_SOCKET unset,
+# grammar_convert loads the model in-process as before.
+
+ASL_POOL_SOCKET = os.getenv("ASL_POOL_SOCKET", "")
+ASL_POOL_WORKERS = int(os.getenv("ASL_POOL_WORKERS", "2"))
+# Intra-op threads per pool worker; workers x threads should not exceed the core count
+ASL_TORCH_THREADS = int(os.getenv("ASL_TORCH_THREADS", "1"))
+# Seconds a web worker waits for one batch (and for the pool to come up) before using rules
+ASL_POOL_TIMEOUT = float(os.getenv("ASL_POOL_TIMEOUT", "30"))
+
+DEFAULT_SOCKET = "/tmp/asl-inference.sock"
+
+# --- 2. CLIENT (USED BY THE WEB WORKERS) ---
+
+class InferencePoolClient:
+    """
+    Stands in for the transformers pipeline in grammar_convert: calling it sends the
+    prompts and generation arguments to the pool and returns the pipeline's results.
+    One short-lived connection per batch, so any idle pool worker can take it.
+    """
+
+    def __init__(self, socket_path, timeout=ASL_POOL_TIMEOUT):
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    def _request(self, message, timeout):
+        conn = Client(self.socket_path, family="AF_UNIX")
+        try:
+            conn.send(message)
+            if not conn.poll(timeout):
+                raise TimeoutError(f"Inference pool did not answer within {timeout:.0f}s")
+            status, payload = conn.recv()
+        finally:
+            conn.close()
+        if status == "error":
+            raise RuntimeError(f"Inference pool error: {payload}")
+        return payload
+
+    def __call__(self, inputs, **kwargs):
+        return self._request((inputs, kwargs), self.timeout)
+
+    def wait_ready(self, timeout=None):
+        """Pings the pool until it answers (it may still be loading the model); returns its backend name. Raises on timeout."""
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                return self._request((None, {}), max(deadline - time.monotonic(), 0.1))
+            except (OSError, EOFError):
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"No inference pool at {self.socket_path}")
+                time.sleep(0.25)
+
+# --- 3. POOL (SERVER SIDE) ---
+
+def _set_torch_threads(torch_threads):
+    try:
+        import torch
+    except ImportError: # the onnx backend does not need torch
+        return
+    torch.set_num_threads(torch_threads)
+
+def _worker_loop(listener, model, torch_threads):
+    """One pool worker: accepts a connection, runs the batch, replies, repeats."""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN) # the parent handles Ctrl+C
+    _set_torch_threads(torch_threads)
+    if model is None:
+        # Unshared mode (benchmark baseline): every worker loads its own copy
+        model = load_backend(ASL_INFERENCE_BACKEND)
+
+    while True:
+        try:
+            conn = listener.accept()
+        except OSError:
+            continue
+        try:
+            inputs, kwargs = conn.recv()
+            if inputs is None:
+                conn.send(("ok", ASL_INFERENCE_BACKEND)) # ping: which backend answers
+            else:
+                conn.send(("ok", model(inputs, **kwargs)))
+        except (EOFError, OSError):
+            pass # client gave up (timeout) or went away
+        except Exception as e:
+            try:
+                conn.send(("error", repr(e)))
+            except OSError:
+                pass
+        finally:
+            conn.close()
+
+def serve(socket_path=DEFAULT_SOCKET, workers=ASL_POOL_WORKERS, torch_threads=ASL_TORCH_THREADS, preload=True):
+    """
+    Loads the model (unless preload=False), forks `workers` processes that all accept on
+    one Unix socket, and restarts any that die. Runs until SIGTERM/SIGINT.
+    """
+    _set_torch_threads(torch_threads)
+    model = None
+    if preload:
+        started = time.perf_counter()
+        model = load_backend(ASL_INFERENCE_BACKEND)
+        print(f"✅ Inference pool loaded the model in {time.perf_counter() - started:.1f}s ({ASL_INFERENCE_BACKEND} backend).")
+        # Move everything loaded so far out of the garbage collector's reach: a collection
+        # in a worker would otherwise write to (and so un-share) every page holding the model
+        gc.freeze()
+
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    previous_umask = os.umask(0o177) # socket only reachable by this user
+    try:
+        listener = Listener(socket_path, family="AF_UNIX", backlog=128)
+    finally:
+        os.umask(previous_umask)
+
+    # fork, not spawn: the children must inherit the loaded model rather than reload it.
+    # Nothing is run on the model before forking, so no torch thread pool is copied half-initialized.
+    context = get_context("fork")
+
+    def start_worker():
+        process = context.Process(target=_worker_loop, args=(listener, model, torch_threads), daemon=True)
+        process.start()
+        return process
+
+    processes = [start_worker() for _ in range(max(1, workers))]
+    print(f"✅ Inference pool serving on {socket_path}: {len(processes)} workers x {torch_threads} torch threads.")
+
+    stopping = []
+    def stop(signum, frame):
+        stopping.append(signum)
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    try:
+        while not stopping:
+            for i, process in enumerate(processes):
+                if not process.is_alive():
+                    print(f"⚠️ Inference worker {process.pid} exited ({process.exitcode}); restarting.")
+                    processes[i] = start_worker()
+            time.sleep(1)
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join(timeout=5)
+        listener.close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shared FLAN-T5 inference pool for the web workers.")
+    parser.add_argument("--socket", default=ASL_POOL_SOCKET or DEFAULT_SOCKET)
+    parser.add_argument("--workers", type=int, default=ASL_POOL_WORKERS)
+    parser.add_argument("--torch-threads", type=int, default=ASL_TORCH_THREADS)
+    parser.add_argument("--no-preload", action="store_true",
+                        help="load the model separately in every worker (no sharing; for comparison)")
+    args = parser.parse_args()
+    serve(args.socket, args.workers, args.torch_threads, preload=not args.no_preload)
@@ -0,0 +1,322 @@
+import argparse
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import rule_engine
+
+# --- 1. SETTINGS ---
+# The sign vocabulary: one row per (source, language, word) with its lemma, clip and format,
+# indexed for exact, case-insensitive, lemma and prefix lookups. The JSON maps stay the
+# interchange format: they are imported in bulk and re-imported only when they change on disk,
+# and MappingWriter upserts its entries here directly, so nothing rewrites or re-parses a
+# whole map per lookup.
+
+LEXICON_DB = os.getenv("ASL_LEXICON_DB", "lexicon.sqlite3")
+# Sign language served by the app; other languages can share the same database
+LANGUAGE = os.getenv("ASL_LEXICON_LANGUAGE", "ASL")
+
+# JSON maps kept in sync automatically: file → (language, priority). Lower priority wins
+# when one word has several clips, matching the old lookup order (videos, then GIFs).
+SOURCES = {
+    "word_to_media.json": (LANGUAGE, 0),
+    "word_to_gif.json": (LANGUAGE, 1),
+}
+
+# Bumped when the tables change shape; the tables only mirror the JSON maps, so an older
+# database is dropped and re-imported
+SCHEMA_VERSION = 2
+SCHEMA = (
+    # lemma is NULL until WordNet has lemmatized the entry (see lemmatize_pending)
+    "CREATE TABLE IF NOT EXISTS signs ("
+    " source TEXT NOT NULL, language TEXT NOT NULL, word TEXT NOT NULL,"
+    " word_key TEXT NOT NULL, lemma TEXT, media TEXT NOT NULL, format TEXT NOT NULL,"
+    " priority INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (source, language, word))",
+    "CREATE INDEX IF NOT EXISTS signs_word ON signs (language, word, priority)",
+    "CREATE INDEX IF NOT EXISTS signs_key ON signs (language, word_key, priority)",
+    "CREATE INDEX IF NOT EXISTS signs_lemma ON signs (language, lemma, priority)",
+    "CREATE TABLE IF NOT EXISTS imports ("
+    " source TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, entries INTEGER NOT NULL)",
+)
+
+def wordnet_lemmatizer():
+    """WordNet lemma function (loads NLTK), or None if its data is not installed."""
+    try:
+        rule_engine.lemmatize("signs")
+    except LookupError:
+        return None
+    table = rule_engine.lemma_table
+    return lambda word_key: table.get(word_key) or rule_engine.lemmatize(word_key)
+
+def _rows(source, language, entries, priority, lemma_of=None):
+    """
+    Table rows for {word: media}. Phrases are their own lemma; single words get one only if
+    `lemma_of` is given, otherwise NULL, so importing never loads NLTK.
+    """
+    rows = []
+    for word, media in entries:
+        word_key = " ".join(word.lower().split())
+        media_format = os.path.splitext(media)[1].lstrip(".").lower()
+        lemma = word_key if " " in word_key else (lemma_of(word_key) if lemma_of else None)
+        rows.append((source, language, word, word_key, lemma, media, media_format, priority))
+    return rows
+
+def file_stat(path):
+    """(size, mtime_ns) of a map file, or None: the version a map was imported at."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+# --- 2. LEXICON ---
+
+_UNKNOWN = object()
+
+class Lexicon:
+    """
+    SQLite-backed word → clip lexicon shared by every worker process.
+    Queries return clip names in priority order; callers check that the file exists.
+    If the database cannot be opened, an in-memory one is used (imported from the JSON maps).
+    """
+
+    def __init__(self, db_path=LEXICON_DB, sources=SOURCES):
+        self.db_path = db_path
+        self.sources = sources
+        self._lock = threading.Lock()
+        self._seen_stats = {}
+        self._writes = 0
+        self._version = None
+        # WordNet lemma function once known (None: data not installed), and the lexicon
+        # version whose entries were last lemmatized
+        self._lemma_lock = threading.Lock()
+        self._lemma_of = _UNKNOWN
+        self._lemmatized_version = None
+        try:
+            self._db = self._connect(db_path)
+        except sqlite3.Error as e:
+            print(f"⚠️ Lexicon database unavailable ({db_path}), using memory: {e}")
+            self._db = self._connect(":memory:")
+        self.check()
+
+    @staticmethod
+    def _connect(db_path):
+        # isolation_level=None: transactions are explicit (see _transaction)
+        db = sqlite3.connect(db_path, check_same_thread=False, timeout=30, isolation_level=None)
+        try:
+            db.execute("PRAGMA journal_mode=WAL") # readers in other workers are not blocked by an import
+        except sqlite3.Error:
+            pass
+        if db.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            db.execute("DROP TABLE IF EXISTS signs")
+            db.execute("DROP TABLE IF EXISTS imports")
+            db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        for statement in SCHEMA:
+            db.execute(statement)
+        return db
+
+    @contextmanager
+    def _transaction(self):
+        """Write transaction; the caller holds self._lock."""
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._db
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+        self._writes += 1
+
+    # --- 2a. WRITES ---
+
+    def import_mapping(self, json_file, language=LANGUAGE, priority=0, force=False):
+        """
+        Bulk-imports a word → media JSON map as one source (replacing its previous rows).
+        Skipped when the file is unchanged since its last import, unless force=True.
+        Returns the number of entries imported, or None if nothing was done.
+        """
+        source = os.path.normpath(json_file)
+        stat = file_stat(json_file)
+        if stat is None:
+            return None
+        if not force and self._imported_stat(source) == stat:
+            self._seen_stats[source] = stat
+            return None
+
+        try:
+            with open(json_file, "r", encoding="utf-8") as f:
+                mapping = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Lexicon kept the previous entries of {json_file}: {e}")
+            return None
+        if not isinstance(mapping, dict):
+            print(f"⚠️ Lexicon ignored {json_file}: expected a JSON object.")
+            return None
+
+        rows = _rows(source, language, [(word, media) for word, media in mapping.items()
+                                        if isinstance(media, str) and word.strip()], priority, self._known_lemmatizer())
+        with self._lock, self._transaction() as db:
+            # Another worker may have imported the same version meanwhile
+            if force or self._imported_stat(source, locked=True) != stat:
+                db.execute("DELETE FROM signs WHERE source = ?", (source,))
+                db.executemany("INSERT OR REPLACE INTO signs VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                db.execute("INSERT OR REPLACE INTO imports VALUES (?, ?, ?, ?)", (source, *stat, len(rows)))
+        self._seen_stats[source] = stat
+        return len(rows)
+
+    def update_source(self, json_file, entries, previous_stat):
+        """
+        Upserts {word: media} that a writer has just committed to `json_file`. If the file was
+        fully imported as it stood before the write (`previous_stat`, see file_stat), its new
+        state is recorded too, so no worker re-imports the whole map. Unknown files are ignored.
+        """
+        source = os.path.normpath(json_file)
+        if source not in self.sources or not entries:
+            return 0
+        language, priority = self.sources[source]
+        rows = _rows(source, language, entries.items(), priority, self._known_lemmatizer())
+        stat = file_stat(json_file)
+        with self._lock, self._transaction() as db:
+            db.executemany("INSERT OR REPLACE INTO signs VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            # Otherwise (e.g. the map was edited by hand since) check() re-imports it
+            if stat is not None and previous_stat is not None and self._imported_stat(source, locked=True) == previous_stat:
+                entries_count = db.execute("SELECT COUNT(*) FROM signs WHERE source = ?", (source,)).fetchone()[0]
+                db.execute("INSERT OR REPLACE INTO imports VALUES (?, ?, ?, ?)", (source, *stat, entries_count))
+                self._seen_stats[source] = stat
+        return len(rows)
+
+    def _known_lemmatizer(self):
+        """The lemma function if WordNet was already loaded here; writes never load it themselves."""
+        return self._lemma_of if self._lemma_of is not _UNKNOWN else None
+
+    def lemmatize_pending(self):
+        """
+        Fills in the lemmas of entries imported without WordNet (or by another process), once per
+        lexicon version. Loads NLTK on the first call: from warm-up, or the first lemma query.
+        Entries stay pending while the WordNet data is missing, and are lemmatized by the first
+        process that runs with it. Returns the number of words lemmatized.
+        """
+        if self._lemma_of is None or self._lemmatized_version == self._version:
+            return 0
+        with self._lemma_lock:
+            if self._lemma_of is _UNKNOWN:
+                self._lemma_of = wordnet_lemmatizer()
+            version = self._version
+            if self._lemma_of is None or self._lemmatized_version == version:
+                return 0
+            with self._lock:
+                pending = [row[0] for row in self._db.execute("SELECT DISTINCT word_key FROM signs WHERE lemma IS NULL")]
+            updates = [(self._lemma_of(word_key), word_key) for word_key in pending]
+            if updates:
+                with self._lock, self._transaction() as db:
+                    db.executemany("UPDATE signs SET lemma = ? WHERE word_key = ? AND lemma IS NULL", updates)
+            self._lemmatized_version = version
+            return len(updates)
+
+    def _imported_stat(self, source, locked=False):
+        def read():
+            row = self._db.execute("SELECT size, mtime_ns FROM imports WHERE source = ?", (source,)).fetchone()
+            return tuple(row) if row else None
+        if locked:
+            return read()
+        with self._lock:
+            return read()
+
+    def check(self):
+        """
+        Imports JSON maps that changed on disk and reports whether the lexicon changed since the
+        last call (here or in another process). Costs one stat per map and one PRAGMA when idle.
+        """
+        for json_file, (language, priority) in self.sources.items():
+            stat = file_stat(json_file)
+            if stat is not None and stat != self._seen_stats.get(os.path.normpath(json_file)):
+                self.import_mapping(json_file, language, priority)
+
+        with self._lock:
+            version = (self._db.execute("PRAGMA data_version").fetchone()[0], self._writes)
+        changed = version != self._version
+        self._version = version
+        return changed
+
+    # --- 2b. QUERIES ---
+
+    def _column(self, sql, args):
+        with self._lock:
+            return [row[0] for row in self._db.execute(sql, args)]
+
+    def media(self, word, language=LANGUAGE):
+        """Clips for the exact word, best first."""
+        return self._column("SELECT media FROM signs WHERE language = ? AND word = ? ORDER BY priority", (language, word))
+
+    def media_by_key(self, word, language=LANGUAGE):
+        """Clips for the word in any casing / spacing, best first."""
+        return self._column("SELECT media FROM signs WHERE language = ? AND word_key = ? ORDER BY priority",
+                            (language, " ".join(word.lower().split())))
+
+    def media_by_lemma(self, lemma, language=LANGUAGE):
+        """Clips of every word with this lemma (PLAYED finds 'playing'), best first."""
+        self.lemmatize_pending()
+        return self._column("SELECT media FROM signs WHERE language = ? AND lemma = ? ORDER BY priority", (language, lemma))
+
+    def prefix(self, prefix, language=LANGUAGE, limit=20):
+        """[(word, media)] for words starting with `prefix` (case-insensitive), alphabetically, one per word."""
+        key = " ".join(prefix.lower().split())
+        with self._lock:
+            rows = self._db.execute(
+                # A range on word_key, so the index is used (LIKE would scan)
+                "SELECT word_key, media FROM signs WHERE language = ? AND word_key >= ? AND word_key < ?"
+                " ORDER BY word_key, priority",
+                (language, key, key + "\U0010ffff"),
+            )
+            results = {}
+            for word_key, media in rows:
+                results.setdefault(word_key, media)
+                if len(results) >= limit:
+                    break
+        return list(results.items())
+
+    def phrases(self, language=LANGUAGE):
+        """[(word_key, media)] for multi-word entries, best clip last (so dict() keeps it)."""
+        with self._lock:
+            return self._db.execute(
+                "SELECT word_key, media FROM signs WHERE language = ? AND instr(word_key, ' ') > 0"
+                " ORDER BY priority DESC", (language,)
+            ).fetchall()
+
+    def words(self, language=LANGUAGE):
+        return set(self._column("SELECT DISTINCT word FROM signs WHERE language = ?", (language,)))
+
+    def languages(self):
+        return self._column("SELECT DISTINCT language FROM signs ORDER BY language", ())
+
+    def stats(self):
+        with self._lock:
+            rows = self._db.execute("SELECT language, COUNT(*), COUNT(DISTINCT word_key) FROM signs GROUP BY language").fetchall()
+        return {language: {"entries": entries, "words": words} for language, entries, words in rows}
+
+
+# Process-wide lexicon shared by the media index, the resolver and the writers
+lexicon = Lexicon()
+
+if __name__ == "__main__":
+    # Bulk import / inspection: python lexicon.py --import ISL/word_to_media.json --language ISL
+    parser = argparse.ArgumentParser(description="SQLite sign lexicon: import word → media JSON maps and query them.")
+    parser.add_argument("--import", dest="imports", nargs="+", metavar="JSON", help="JSON maps to (re-)import")
+    parser.add_argument("--language", default=LANGUAGE, help=f"language of imported entries and queries (default {LANGUAGE})")
+    parser.add_argument("--priority", type=int, default=0, help="priority of imported entries (lower wins)")
+    parser.add_argument("--prefix", help="list words starting with this prefix")
+    parser.add_argument("--lemma", help="list clips of words with this lemma")
+    args = parser.parse_args()
+
+    for json_file in args.imports or ():
+        count = lexicon.import_mapping(json_file, args.language, args.priority, force=True)
+        print(f"✅ Imported {count or 0} {args.language} entries from {json_file}.")
+    if args.prefix is not None:
+        for word, media in lexicon.prefix(args.prefix, args.language):
+            print(f"{word} → {media}")
+    if args.lemma:
+        print("\n".join(lexicon.media_by_lemma(args.lemma.lower(), args.language)) or "(none)")
+    for language, counts in lexicon.stats().items():
+        print(f"📚 {language}: {counts['words']} words, {counts['entries']} entries ({lexicon.db_path})")
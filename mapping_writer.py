@@ -0,0 +1,95 @@
+import os
+import json
+import tempfile
+import threading
+from contextlib import contextmanager
+
+from atomic_files import match_file_mode
+from lexicon import file_stat, lexicon
+
+# --- 1. CROSS-PROCESS FILE LOCK ---
+
+@contextmanager
+def file_lock(lock_path):
+    """Exclusive advisory lock on `lock_path`, held for the duration of the with-block."""
+    with open(lock_path, "a+") as lock_file:
+        if os.name == "nt":
+            import msvcrt
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+# --- 2. BATCHED, ATOMIC MAPPING WRITER ---
+
+class MappingWriter:
+    """
+    Collects word → media updates in memory and commits them to the JSON file in one write.
+    Each commit takes a file lock, re-reads the file (so entries added by other writers are kept),
+    writes a temp file and swaps it in with os.replace, so readers never see a torn file.
+    The same entries are upserted into the lexicon, which the lookups query.
+    """
+
+    def __init__(self, json_file="word_to_media.json"):
+        self.json_file = json_file
+        self.lock_path = f"{json_file}.lock"
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def update(self, word, media_file):
+        with self._lock:
+            self._pending[word] = media_file
+
+    def flush(self):
+        """Commits pending updates. Returns the number of entries written."""
+        with self._lock:
+            if not self._pending:
+                return 0
+            pending, self._pending = self._pending, {}
+
+        try:
+            with file_lock(self.lock_path):
+                previous_stat = file_stat(self.json_file)
+                try:
+                    with open(self.json_file, "r") as f:
+                        word_map = json.load(f)
+                except FileNotFoundError:
+                    word_map = {}
+                word_map.update(pending)
+
+                folder = os.path.dirname(os.path.abspath(self.json_file))
+                fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=folder)
+                try:
+                    match_file_mode(fd, self.json_file)
+                    with os.fdopen(fd, "w") as f:
+                        json.dump(word_map, f, indent=2)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    os.replace(temp_path, self.json_file)
+                finally:
+                    if os.path.exists(temp_path):
+                        os.remove(temp_path)
+                lexicon.update_source(self.json_file, pending, previous_stat)
+        except Exception:
+            # Put the updates back so a later flush can retry them
+            with self._lock:
+                self._pending = {**pending, **self._pending}
+            raise
+
+        return len(pending)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.flush()
@@ -0,0 +1,200 @@
+import os
+import hashlib
+import json
+import threading
+from lexicon import LANGUAGE, file_stat, lexicon as default_lexicon
+from media_store import LETTER_MAP_FILE, is_content_addressed, letter_of
+
+MEDIA_FOLDER = "media"
+# Remembered word → clip lookups (letters, common words); dropped whenever anything changes
+LOOKUP_CACHE_SIZE = 4096
+
+# --- 1. MEDIA INDEX ---
+
+class MediaIndex:
+    """
+    In-memory view of the media folder, combined with the word → file entries of the
+    lexicon and the letter → file entries of the letter map. The folder is scanned once and
+    only re-scanned when its mtime changes; word lookups are remembered until the folder,
+    the lexicon or the letter map changes.
+    """
+
+    def __init__(self, media_folder=MEDIA_FOLDER, lexicon=default_lexicon, language=LANGUAGE,
+                 letter_map_file=LETTER_MAP_FILE):
+        self.media_folder = media_folder
+        self.lexicon = lexicon
+        self.language = language
+        self.letter_map_file = letter_map_file
+        self._lock = threading.Lock()
+        self._files = frozenset()
+        self._fingerprints = {}
+        self._lookups = {}
+        self._letters = {}
+        self._letter_map_stat = None
+        self._dir_mtime = None
+        # Bumped whenever the files or mappings change, so derived indexes know to rebuild
+        self.generation = 0
+        self.refresh(force=True)
+
+    def refresh(self, force=False):
+        """Re-scans the media folder if it has changed, and lets the lexicon and letter map pick up edits."""
+        lexicon_changed = self.lexicon.check()
+        if self._check_letter_map() or lexicon_changed:
+            self._lookups = {}
+            self.generation += 1
+
+        try:
+            dir_mtime = os.stat(self.media_folder).st_mtime_ns
+        except OSError:
+            dir_mtime = None
+
+        if not force and dir_mtime == self._dir_mtime:
+            return False
+
+        with self._lock:
+            try:
+                with os.scandir(self.media_folder) as entries:
+                    stats = {entry.name: entry.stat() for entry in entries if entry.is_file()}
+            except OSError:
+                stats = {}
+            files = frozenset(stats)
+
+            # Fingerprints survive a re-scan only for files whose size and mtime are unchanged
+            fingerprints = {
+                filename: cached for filename, cached in self._fingerprints.items()
+                if filename in stats and cached[0] == (stats[filename].st_size, stats[filename].st_mtime_ns)
+            }
+
+            # Swap in the new set in one step so readers never see a half-built index
+            self._files = files
+            self._fingerprints = fingerprints
+            self._dir_mtime = dir_mtime
+            self._lookups = {}
+            self.generation += 1
+        return True
+
+    def _check_letter_map(self):
+        """Reloads the letter map if its file changed (a missing file is an empty map). True if it did."""
+        stat = file_stat(self.letter_map_file)
+        if stat == self._letter_map_stat:
+            return False
+        letters = {}
+        if stat is not None:
+            try:
+                with open(self.letter_map_file, "r", encoding="utf-8") as f:
+                    mapping = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Letter map kept its previous entries ({self.letter_map_file}): {e}")
+                return False
+            if isinstance(mapping, dict):
+                letters = {letter_of(key): media_file for key, media_file in mapping.items()
+                           if letter_of(key) and isinstance(media_file, str)}
+        self._letters = letters
+        self._letter_map_stat = stat
+        return True
+
+    def add(self, filename):
+        """Registers a file a downloader has just written, without waiting for a re-scan. Returns its name."""
+        filename = os.path.basename(filename)
+        with self._lock:
+            self._files = self._files | {filename}
+            self._fingerprints.pop(filename, None)
+            self._lookups = {}
+            self.generation += 1
+        return filename
+
+    def has_file(self, filename):
+        return filename in self._files
+
+    def files(self):
+        return self._files
+
+    def fingerprint(self, filename, verify=False):
+        """
+        Short content hash of a media file, used as a cache-busting version in URLs.
+        Computed once per file and kept in memory until a re-scan finds the file's size or
+        mtime changed (or add() registers it again), so a cached URL costs no stat.
+        A clip overwritten in place leaves the folder's mtime alone, so no re-scan notices it:
+        with verify=True the file is stat-ed and a hash whose size or mtime no longer match
+        is recomputed (bumping the generation when the content did change).
+        A content-addressed file's name already is its hash.
+        """
+        if is_content_addressed(filename):
+            return os.path.splitext(filename)[0]
+        path = os.path.join(self.media_folder, filename)
+        cached = self._fingerprints.get(filename)
+        if cached:
+            if not verify:
+                return cached[1]
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return None
+            if (stat.st_size, stat.st_mtime_ns) == cached[0]:
+                return cached[1]
+
+        digest = hashlib.sha256()
+        try:
+            with open(path, "rb") as f:
+                stat = os.fstat(f.fileno())
+                for chunk in iter(lambda: f.read(1 << 16), b""):
+                    digest.update(chunk)
+        except OSError:
+            return None
+        fingerprint = digest.hexdigest()[:12]
+        self._fingerprints[filename] = ((stat.st_size, stat.st_mtime_ns), fingerprint)
+        if cached and cached[1] != fingerprint:
+            # Derived indexes (clip metadata, the fingerspelling atlas) must look at the file again
+            with self._lock:
+                self.generation += 1
+        return fingerprint
+
+    def url_for(self, filename):
+        """Content-versioned URL for a media file, safe to cache as immutable."""
+        if is_content_addressed(filename):
+            return f"/media/{filename}" # the name is the version
+        fingerprint = self.fingerprint(filename)
+        return f"/media/{filename}?v={fingerprint}" if fingerprint else f"/media/{filename}"
+
+    def media_for(self, word):
+        """
+        Returns the media filename for a gloss token, or None if no clip exists.
+        Lexicon entries for the exact word are tried first (word_to_media.json before
+        word_to_gif.json), then the '<word>.mp4' naming convention.
+        """
+        lookups = self._lookups
+        if word in lookups:
+            return lookups[word]
+
+        files = self._files
+        media_file = next((name for name in self.lexicon.media(word, self.language) if name in files), None)
+        if media_file is None and f"{word}.mp4" in files:
+            media_file = f"{word}.mp4"
+        if len(lookups) >= LOOKUP_CACHE_SIZE:
+            lookups.clear()
+        lookups[word] = media_file
+        return media_file
+
+    def vocabulary(self):
+        """Words that have a clip: lexicon words plus word-named media files without extension."""
+        words = {os.path.splitext(filename)[0] for filename in self._files if not is_content_addressed(filename)}
+        words.update(self.lexicon.words(self.language))
+        return words
+
+    def letter_file(self, letter):
+        """
+        Returns the fingerspelling clip for a single letter, or None if it is missing: the
+        letter map's entry, else a dedicated '<LETTER>.mp4' clip. Word entries are never used,
+        even when named like a letter: c.mp4 may be the sign for CAT, and 'i' is the pronoun.
+        """
+        letter = letter.upper()
+        files = self._files
+        media_file = self._letters.get(letter)
+        if media_file in files:
+            return media_file
+        media_file = f"{letter}.mp4"
+        return media_file if media_file in files else None
+
+
+# Process-wide index shared by the routes, fingerspelling and the downloaders
+media_index = MediaIndex()
@@ -0,0 +1,305 @@
+import argparse
+import json
+import os
+import struct
+import tempfile
+import threading
+
+from atomic_files import match_file_mode
+from media_index import media_index as default_media_index
+
+METADATA_FILE = os.getenv("MEDIA_METADATA_FILE", "media_metadata.json")
+# Clips probed on demand are written to the sidecar together, at most this often (seconds)
+SAVE_DELAY = 2.0
+
+# --- 1. HEADER PROBES (NO DECODING) ---
+
+def _boxes(data, start=0, end=None):
+    """Yields (type, payload_start, payload_end) for the ISO-BMFF boxes in data[start:end]."""
+    end = len(data) if end is None else end
+    offset = start
+    while offset + 8 <= end:
+        size, box_type = struct.unpack_from(">I4s", data, offset)
+        header = 8
+        if size == 1:
+            size = struct.unpack_from(">Q", data, offset + 8)[0]
+            header = 16
+        elif size == 0:
+            size = end - offset
+        if size < header:
+            return
+        yield box_type, offset + header, min(offset + size, end)
+        offset += size
+
+def _child(data, start, end, box_type):
+    for child_type, child_start, child_end in _boxes(data, start, end):
+        if child_type == box_type:
+            return child_start, child_end
+    return None
+
+def _read_moov(f, file_size):
+    """Walks the top-level boxes by seeking (mdat is skipped, never read) and returns moov's bytes."""
+    offset = 0
+    while offset + 8 <= file_size:
+        f.seek(offset)
+        header = f.read(16)
+        if len(header) < 8:
+            break
+        size, box_type = struct.unpack_from(">I4s", header)
+        header_size = 8
+        if size == 1:
+            size = struct.unpack_from(">Q", header, 8)[0]
+            header_size = 16
+        elif size == 0:
+            size = file_size - offset
+        if size < header_size:
+            break
+        if box_type == b"moov":
+            f.seek(offset)
+            return f.read(size)
+        offset += size
+    return None
+
+def _avc_codec(data, start, end, entry_type):
+    """RFC 6381 codec string (e.g. avc1.64001f) from the avcC box, or the bare sample entry type."""
+    codec = entry_type.decode("latin-1").strip()
+    # VisualSampleEntry: 8-byte SampleEntry + 70 bytes of visual fields, then child boxes
+    avcc = _child(data, start + 78, end, b"avcC") if codec in ("avc1", "avc3") else None
+    if avcc and avcc[1] - avcc[0] >= 4:
+        profile, compatibility, level = data[avcc[0] + 1:avcc[0] + 4]
+        return f"{codec}.{profile:02x}{compatibility:02x}{level:02x}"
+    return codec
+
+def probe_mp4(f, file_size):
+    moov = _read_moov(f, file_size)
+    if moov is None:
+        return {}
+    info = {}
+    _, moov_start, moov_end = next(_boxes(moov))
+
+    mvhd = _child(moov, moov_start, moov_end, b"mvhd")
+    if mvhd:
+        version = moov[mvhd[0]]
+        if version == 1:
+            timescale, duration = struct.unpack_from(">IQ", moov, mvhd[0] + 20)
+        else:
+            timescale, duration = struct.unpack_from(">II", moov, mvhd[0] + 12)
+        if timescale:
+            info["duration"] = round(duration / timescale, 3)
+
+    for box_type, trak_start, trak_end in _boxes(moov, moov_start, moov_end):
+        if box_type != b"trak":
+            continue
+        mdia = _child(moov, trak_start, trak_end, b"mdia")
+        hdlr = mdia and _child(moov, mdia[0], mdia[1], b"hdlr")
+        if not hdlr or moov[hdlr[0] + 8:hdlr[0] + 12] != b"vide":
+            continue
+
+        tkhd = _child(moov, trak_start, trak_end, b"tkhd")
+        if tkhd:
+            # Width and height are 16.16 fixed point, the last 8 bytes of tkhd
+            width, height = struct.unpack_from(">II", moov, tkhd[1] - 8)
+            info["width"], info["height"] = width >> 16, height >> 16
+
+        minf = _child(moov, mdia[0], mdia[1], b"minf")
+        stbl = minf and _child(moov, minf[0], minf[1], b"stbl")
+        stsd = stbl and _child(moov, stbl[0], stbl[1], b"stsd")
+        if stsd:
+            # stsd: version/flags + entry count, then the first sample entry box
+            for entry_type, entry_start, entry_end in _boxes(moov, stsd[0] + 8, stsd[1]):
+                info["codec"] = _avc_codec(moov, entry_start, entry_end, entry_type)
+                break
+        break
+    return info
+
+def _skip_sub_blocks(f):
+    while True:
+        length = f.read(1)
+        if not length or length[0] == 0:
+            return
+        f.seek(length[0], os.SEEK_CUR)
+
+def probe_gif(f, file_size):
+    """Dimensions from the screen descriptor; duration as the sum of frame delays (blocks are skipped, not decoded)."""
+    header = f.read(13)
+    if len(header) < 13 or header[:3] != b"GIF":
+        return {}
+    width, height, flags = struct.unpack_from("<HHB", header, 6)
+    info = {"width": width, "height": height, "codec": "gif"}
+    if flags & 0x80:
+        f.seek(3 * (2 << (flags & 0x07)), os.SEEK_CUR) # global color table
+
+    delay = 0
+    while True:
+        block = f.read(1)
+        if not block or block == b"\x3b": # trailer
+            break
+        if block == b"\x21": # extension
+            label = f.read(1)
+            if label == b"\xf9": # graphic control: delay in 1/100 s
+                control = f.read(6)
+                if len(control) == 6:
+                    delay += struct.unpack_from("<H", control, 2)[0]
+            else:
+                _skip_sub_blocks(f)
+        elif block == b"\x2c": # image descriptor
+            descriptor = f.read(9)
+            if len(descriptor) < 9:
+                break
+            if descriptor[8] & 0x80:
+                f.seek(3 * (2 << (descriptor[8] & 0x07)), os.SEEK_CUR) # local color table
+            f.seek(1, os.SEEK_CUR) # LZW minimum code size
+            _skip_sub_blocks(f)
+        else:
+            break
+    if delay:
+        info["duration"] = round(delay / 100, 3)
+    return info
+
+PROBES = {".mp4": probe_mp4, ".m4v": probe_mp4, ".mov": probe_mp4, ".gif": probe_gif}
+
+def probe(path):
+    """Duration (s), width, height and codec from the file's headers, plus its byte size."""
+    size = os.path.getsize(path)
+    info = {"size": size}
+    prober = PROBES.get(os.path.splitext(path)[1].lower())
+    if prober:
+        try:
+            with open(path, "rb") as f:
+                info.update(prober(f, size))
+        except (OSError, struct.error, StopIteration, IndexError) as e:
+            print(f"⚠️ Could not read media headers of {path}: {e}")
+    return info
+
+# --- 2. SIDECAR INDEX ---
+
+class MediaMetadata:
+    """
+    Per-clip metadata kept in a small JSON sidecar (media_metadata.json), keyed by file name.
+    Each entry remembers the file's size and mtime; a new or changed file is probed the first
+    time it is asked for, so clips added by the downloaders are picked up without a full re-index.
+    A file is checked against its entry once per media index generation; until the folder
+    changes, lookups are served from memory without touching the filesystem.
+    """
+
+    FIELDS = ("duration", "width", "height", "size", "codec")
+
+    def __init__(self, media_index=default_media_index, index_file=METADATA_FILE):
+        self.media_index = media_index
+        self.index_file = index_file
+        self._lock = threading.Lock()
+        self._save_timer = None
+        self._checked = set() # files whose entry matched the file in _checked_generation
+        self._checked_generation = None
+        self._entries = self._load()
+
+    def _load(self):
+        try:
+            with open(self.index_file, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+            return entries if isinstance(entries, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        folder = os.path.dirname(os.path.abspath(self.index_file))
+        fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=folder)
+        try:
+            match_file_mode(fd, self.index_file)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, separators=(",", ":"), sort_keys=True)
+            os.replace(temp_path, self.index_file)
+        except OSError as e:
+            print(f"⚠️ Could not write {self.index_file}: {e}")
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def _save_later(self):
+        """Coalesces on-demand probes into one sidecar write instead of rewriting it per new clip."""
+        if self._save_timer is None:
+            def flush():
+                with self._lock:
+                    self._save_timer = None
+                    self._save()
+            self._save_timer = threading.Timer(SAVE_DELAY, flush)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def _entry(self, filename):
+        """Returns (entry, changed): the cached entry if the file is unchanged, else a fresh probe."""
+        path = os.path.join(self.media_index.media_folder, filename)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None, False
+        entry = self._entries.get(filename)
+        if entry and entry.get("size") == stat.st_size and entry.get("mtime") == stat.st_mtime_ns:
+            return entry, False
+        entry = {**probe(path), "mtime": stat.st_mtime_ns}
+        return entry, True
+
+    def get(self, filename):
+        """Metadata for one clip ({duration, width, height, size, codec}; missing fields omitted), or None."""
+        generation = self.media_index.generation
+        if generation != self._checked_generation:
+            self._checked = set()
+            self._checked_generation = generation
+        entry = self._entries.get(filename) if filename in self._checked else None
+        if entry is None:
+            entry, changed = self._entry(filename)
+            if entry is None:
+                return None
+            if changed:
+                with self._lock:
+                    self._entries[filename] = entry
+                    self._save_later()
+            self._checked.add(filename)
+        return {field: entry[field] for field in self.FIELDS if field in entry}
+
+    def describe_url(self, url):
+        """Metadata for a /media/ URL as returned by the pipeline (the ?v= version is ignored)."""
+        path = url.split("?", 1)[0]
+        if not path.startswith("/media/"):
+            return None
+        return self.get(path[len("/media/"):])
+
+    def update(self, force=False):
+        """
+        Incremental pass over the media folder: probes new and changed files (all files with
+        force=True) and drops entries for deleted ones. Returns (probed, removed, unchanged).
+        """
+        self.media_index.refresh()
+        files = self.media_index.files()
+        probed = unchanged = 0
+        with self._lock:
+            self._checked = set()
+            if force:
+                self._entries = {}
+            for filename in sorted(files):
+                entry, changed = self._entry(filename)
+                if entry is None:
+                    continue
+                if changed:
+                    self._entries[filename] = entry
+                    probed += 1
+                else:
+                    unchanged += 1
+            removed = [filename for filename in self._entries if filename not in files]
+            for filename in removed:
+                del self._entries[filename]
+            if probed or removed or force:
+                self._save()
+        return probed, len(removed), unchanged
+
+
+# Process-wide metadata index shared by the routes and the downloaders
+media_metadata = MediaMetadata()
+
+if __name__ == "__main__":
+    # Offline indexer: python media_metadata.py [--rebuild]
+    parser = argparse.ArgumentParser(description="Index duration, size, dimensions and codec of every clip in media/.")
+    parser.add_argument("--rebuild", action="store_true", help="re-probe every file instead of only new/changed ones")
+    args = parser.parse_args()
+    probed, removed, unchanged = media_metadata.update(force=args.rebuild)
+    print(f"✅ {media_metadata.index_file}: {probed} probed, {removed} removed, {unchanged} unchanged.")
@@ -0,0 +1,194 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+
+from atomic_files import match_file_mode
+from mapping_writer import MappingWriter
+
+# --- 1. SETTINGS ---
+# Clips are stored once per content, as media/<first 16 hex digits of their SHA-256>.<ext>;
+# the word → file maps (word_to_media.json, word_to_gif.json) point words at those names.
+# The same clip downloaded for play/playing or HELLO/hello is then one file and one URL,
+# and since a name never changes meaning, /media/<hash>.<ext> can be cached as immutable.
+# Word-named files (hello.mp4) keep working until `python media_store.py --migrate`.
+# Fingerspelling clips are not words: they are named '<LETTER>.mp4' or listed in the letter map.
+
+MEDIA_FOLDER = "media"
+MAPPING_FILES = ("word_to_media.json", "word_to_gif.json")
+LETTER_MAP_FILE = "letter_to_media.json"
+HASH_LENGTH = 16
+
+_CONTENT_NAME = re.compile(r"^[0-9a-f]{%d}\.[0-9a-z]+$" % HASH_LENGTH)
+
+def is_content_addressed(filename):
+    """True for store names (<hash>.<ext>), whose content is fixed by the name itself."""
+    return bool(_CONTENT_NAME.match(filename))
+
+def letter_of(key):
+    """The letter a letter-map key stands for (uppercased), or None if it is not a single letter."""
+    return key.upper() if len(key) == 1 and key.isalpha() else None
+
+def _extension(extension):
+    # Extensions come from remote URLs ("mp4?token=..."): keep only the plain suffix
+    return re.sub(r"[^0-9a-z]", "", extension.split("?", 1)[0].lower()) or "mp4"
+
+def content_name(path, extension=None):
+    """Store name for an existing file: <hash>.<ext>, with the file's own extension by default."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    extension = extension or os.path.splitext(path)[1].lstrip(".")
+    return f"{digest.hexdigest()[:HASH_LENGTH]}.{_extension(extension)}"
+
+# --- 2. INGEST ---
+
+class MediaStore:
+    """Writes downloaded clips into the media folder under their content name, once per content."""
+
+    def __init__(self, media_folder=MEDIA_FOLDER):
+        self.media_folder = media_folder
+
+    def ingest(self, chunks, extension):
+        """
+        Streams `chunks` (bytes) into the store, hashing while writing. Returns (filename, stored):
+        stored is False when the same content was already there, in which case nothing is written.
+        """
+        os.makedirs(self.media_folder, exist_ok=True)
+        digest = hashlib.sha256()
+        # Written to a temp file and renamed, so a partial clip is never served
+        fd, temp_path = tempfile.mkstemp(suffix=".part", dir=self.media_folder)
+        try:
+            match_file_mode(fd) # served clips are world-readable like any other file, not mkstemp's 0600
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    digest.update(chunk)
+                    f.write(chunk)
+            filename = f"{digest.hexdigest()[:HASH_LENGTH]}.{_extension(extension)}"
+            path = os.path.join(self.media_folder, filename)
+            if os.path.exists(path):
+                return filename, False
+            os.replace(temp_path, path)
+            return filename, True
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def ingest_bytes(self, data, extension):
+        return self.ingest([data], extension)
+
+    # --- 3. MIGRATION OF A WORD-NAMED FOLDER ---
+
+    def plan_migration(self, mapping_files=MAPPING_FILES, letter_map_file=LETTER_MAP_FILE):
+        """
+        Returns (renames, mapping_updates): {old filename: store name} for every word-named
+        file, and {json_file: {word or letter: store name}} for the map entries to add or rewrite.
+        Files found through the '<word>.<ext>' convention get an explicit entry in the first map;
+        dedicated letter clips ('<LETTER>.mp4') also get one in the letter map.
+        """
+        renames = {}
+        for filename in sorted(os.listdir(self.media_folder)):
+            path = os.path.join(self.media_folder, filename)
+            if (not os.path.isfile(path) or is_content_addressed(filename)
+                    or filename.startswith(".") or filename.endswith((".part", ".tmp"))):
+                continue
+            renames[filename] = content_name(path)
+
+        mappings = {}
+        for json_file in (*mapping_files, letter_map_file):
+            try:
+                with open(json_file, "r") as f:
+                    mappings[json_file] = json.load(f)
+            except FileNotFoundError:
+                mappings[json_file] = {}
+
+        mapping_updates = {json_file: {} for json_file in mappings}
+        for json_file, word_map in mappings.items():
+            for word, media_file in word_map.items():
+                if media_file in renames:
+                    mapping_updates[json_file][word] = renames[media_file]
+        mapped_words = {word for json_file in mapping_files for word in mappings[json_file]}
+        for filename, target in renames.items():
+            stem, extension = os.path.splitext(filename)
+            if stem not in mapped_words:
+                mapping_updates[mapping_files[0]][stem] = target
+            if extension == ".mp4" and stem.isupper() and letter_of(stem) and stem not in mappings[letter_map_file]:
+                mapping_updates[letter_map_file][stem] = target
+        return renames, mapping_updates
+
+    def migrate(self, mapping_files=MAPPING_FILES, letter_map_file=LETTER_MAP_FILE, dry_run=False):
+        """
+        Moves the folder to content names: one file per distinct content, maps rewritten to
+        point at them, word-named files removed. Safe to re-run; an interrupted run leaves
+        every clip reachable (new files and maps are in place before old files are deleted).
+        Returns a report dict.
+        """
+        renames, mapping_updates = self.plan_migration(mapping_files, letter_map_file)
+
+        groups = {}
+        for filename, target in renames.items():
+            groups.setdefault(target, []).append(filename)
+        existing = set(os.listdir(self.media_folder))
+        duplicate_bytes = sum(
+            os.path.getsize(os.path.join(self.media_folder, filename))
+            for target, filenames in groups.items()
+            # Every copy beyond the first is a duplicate, and so is the first if the store already has it
+            for filename in (filenames if target in existing else filenames[1:])
+        )
+        report = {
+            "files": len(renames),
+            "contents": len(groups),
+            "duplicates": len(renames) - len([target for target in groups if target not in existing]),
+            "bytes_saved": duplicate_bytes,
+            "mapping_updates": sum(len(updates) for updates in mapping_updates.values()),
+            "duplicate_groups": sorted(filenames for filenames in groups.values() if len(filenames) > 1),
+        }
+        if dry_run:
+            return report
+
+        # 1. One store file per content (hard link where possible: no copy, same inode)
+        for target, filenames in groups.items():
+            target_path = os.path.join(self.media_folder, target)
+            if not os.path.exists(target_path):
+                source_path = os.path.join(self.media_folder, filenames[0])
+                try:
+                    os.link(source_path, target_path)
+                except OSError:
+                    shutil.copy2(source_path, target_path)
+
+        # 2. Maps point at the store names (atomic, under the same lock the downloaders use)
+        for json_file, updates in mapping_updates.items():
+            if updates:
+                with MappingWriter(json_file) as writer:
+                    for word, target in updates.items():
+                        writer.update(word, target)
+
+        # 3. Word-named files are no longer referenced
+        for filename in renames:
+            os.remove(os.path.join(self.media_folder, filename))
+        return report
+
+
+# Process-wide store used by the downloaders
+media_store = MediaStore()
+
+if __name__ == "__main__":
+    # Migration tool: python media_store.py --migrate [--dry-run]
+    parser = argparse.ArgumentParser(description="Content-addressed media store: deduplicate media/ and rename clips by hash.")
+    parser.add_argument("--migrate", action="store_true", help="rename word-named clips to content names and rewrite the maps")
+    parser.add_argument("--dry-run", action="store_true", help="only report what --migrate would do")
+    args = parser.parse_args()
+    if not (args.migrate or args.dry_run):
+        parser.error("nothing to do: pass --migrate (optionally with --dry-run)")
+
+    report = media_store.migrate(dry_run=args.dry_run)
+    for filenames in report["duplicate_groups"]:
+        print(f"♻️ Same clip: {', '.join(filenames)}")
+    prefix = "Would migrate" if args.dry_run else "✅ Migrated"
+    print(f"{prefix} {report['files']} files to {report['contents']} stored clips: "
+          f"{report['duplicates']} duplicates, {report['bytes_saved'] / 1e6:.1f} MB saved, "
+          f"{report['mapping_updates']} map entries written.")
@@ -0,0 +1,267 @@
+import atexit
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from logging.handlers import QueueHandler, QueueListener
+
+# --- 1. SETTINGS ---
+# Process-wide timing spans and counters, exported in the Prometheus text format at /metrics.
+# Every web worker keeps its own numbers: with several gunicorn workers, scrape each of them
+# (or run one worker per scrape target) and let Prometheus sum the series.
+
+# Histogram upper bounds in seconds: from in-memory lookups (~10 us) to slow upstream calls
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Share of per-word / per-request log lines that are actually written (1 = all, 0 = none).
+# Every event is still counted in asl_log_events_total, sampled or not.
+LOG_SAMPLE_RATE = float(os.getenv("ASL_LOG_SAMPLE_RATE", "0.01"))
+# Log lines waiting for the writer thread; beyond this they are dropped, never waited on
+LOG_QUEUE_SIZE = 10000
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# --- 2. METRIC TYPES ---
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+def _number(value):
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+def family(name, kind, help_text, samples):
+    """Exposition lines for one metric family; samples are (labels dict, value) pairs."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        if value is None:
+            continue
+        lines.append(f"{name}{_labels(labels, labels.values())} {_number(value)}")
+    return lines
+
+class Counter:
+    """Monotonic count per label combination, e.g. counter.inc(tier="exact")."""
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {} if self.labelnames else {(): 0} # an unlabelled counter is exported from the start
+
+    def inc(self, amount=1, **labels):
+        self._inc(tuple(labels[name] for name in self.labelnames), amount)
+
+    def _inc(self, key, amount=1):
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def collect(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        lines.extend(f"{self.name}{_labels(self.labelnames, key)} {_number(value)}" for key, value in values)
+        return lines
+
+class Histogram:
+    """Bucketed observations (seconds) per label combination, e.g. histogram.observe(0.02, stage="gpt")."""
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._series = {} # label values -> [per-bucket counts (+Inf last), sum]
+
+    def observe(self, value, **labels):
+        self._observe(tuple(labels[name] for name in self.labelnames), value)
+
+    def _observe(self, key, value):
+        index = bisect_left(self.buckets, value) # first bound >= value, i.e. the "le" bucket
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def collect(self):
+        with self._lock:
+            series = sorted((key, (list(counts), total)) for key, (counts, total) in self._series.items())
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        bounds = [_number(float(bound)) for bound in self.buckets] + ["+Inf"]
+        for key, (counts, total) in series:
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, [('le', bound)])} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+class Registry:
+    """
+    The metrics of one process. Components that already keep their own counters (caches,
+    batcher, playback) are read at scrape time by collectors: functions returning
+    exposition lines (see family()), so nothing is added to their hot paths.
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name, help_text, labelnames=()):
+        metric = Counter(name, help_text, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        metric = Histogram(name, help_text, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector):
+        self._collectors.append(collector)
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.collect())
+        for collector in self._collectors:
+            try:
+                lines.extend(collector())
+            except Exception as e:
+                # One broken collector must not take the whole scrape down
+                log_sampled("collector_failed", "⚠️ Metrics collector %s failed: %r", collector.__name__, e,
+                            level=logging.WARNING, rate=1.0)
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry and the instruments shared by the modules
+registry = Registry()
+
+pipeline_stage_seconds = registry.histogram(
+    "asl_pipeline_stage_seconds",
+    "Work time of each TranslationPipeline stage (normalize, gloss, resolve, fallback).",
+    ["stage"],
+)
+operation_seconds = registry.histogram(
+    "asl_operation_seconds",
+    "Duration of individual operations: model_gloss, rule_fallback, gpt, wikipedia, fingerspell, download.",
+    ["operation"],
+)
+operation_errors = registry.counter(
+    "asl_operation_errors_total",
+    "Operations that raised, by operation.",
+    ["operation"],
+)
+media_tiers = registry.counter(
+    "asl_media_tier_total",
+    "Resolved sign spans by tier (exact, phrase, case, lemma, synonym, fingerspell, skipped).",
+    ["tier"],
+)
+log_events = registry.counter(
+    "asl_log_events_total",
+    "Log events by kind, including the ones not written because of sampling.",
+    ["event"],
+)
+log_dropped = registry.counter(
+    "asl_log_dropped_total",
+    "Sampled log lines dropped because the writer thread was behind.",
+)
+
+# --- 3. TIMING SPANS ---
+# These sit on microsecond-scale paths (rule fallback, fingerspelling), so they pass the
+# label values as ready-made keys instead of going through the keyword-argument API.
+
+def record_stage(stage, seconds):
+    """TranslationPipeline timing hook."""
+    pipeline_stage_seconds._observe((stage,), seconds)
+
+def record_tier(tier):
+    """TranslationPipeline tier hook."""
+    media_tiers._inc((tier,))
+
+class span:
+    """
+    Times a block into asl_operation_seconds (`with span("gpt"): ...`); an exception also
+    counts in asl_operation_errors_total and is re-raised.
+    """
+
+    __slots__ = ("key", "started")
+
+    def __init__(self, operation):
+        self.key = (operation,)
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        operation_seconds._observe(self.key, time.perf_counter() - self.started)
+        if exc_type is not None:
+            operation_errors._inc(self.key)
+        return False
+
+def timed(operation):
+    """Decorator form of span()."""
+    key = (operation,)
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            except BaseException:
+                operation_errors._inc(key)
+                raise
+            finally:
+                operation_seconds._observe(key, time.perf_counter() - started)
+        return wrapper
+    return decorate
+
+# --- 4. SAMPLED, NON-BLOCKING LOGGING ---
+# Request paths enqueue log records and return; one background thread writes them out,
+# so a slow terminal or log pipe never stalls a request.
+
+class _DroppingQueueHandler(QueueHandler):
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            log_dropped.inc()
+
+_log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+_stream_handler = logging.StreamHandler(sys.stdout)
+_stream_handler.setFormatter(logging.Formatter("%(message)s"))
+_log_listener = QueueListener(_log_queue, _stream_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop) # flush what is still queued
+
+logger = logging.getLogger("asl")
+logger.setLevel(logging.INFO)
+logger.addHandler(_DroppingQueueHandler(_log_queue))
+logger.propagate = False
+
+def log_sampled(event, message, *args, level=logging.INFO, rate=None):
+    """
+    Counts `event` and writes the message for a random `rate` share of calls (default
+    LOG_SAMPLE_RATE). The message is only formatted (with *args) when it is written.
+    """
+    log_events._inc((event,))
+    rate = LOG_SAMPLE_RATE if rate is None else rate
+    if rate >= 1 or (rate > 0 and random.random() < rate):
+        logger.log(level, message, *args)
@@ -1,7 +1,9 @@
 import os
-import json
 import requests
 from bs4 import BeautifulSoup
+from media_index import media_index
+from media_store import MediaStore
+from mapping_writer import MappingWriter
 
 # Folder to store downloaded media
 media_folder = "media"
@@ -10,20 +12,24 @@ os.makedirs(media_folder, exist_ok=True)
 # JSON file to store word-to-media mappings
 json_file = "word_to_media.json"
 
-# Load existing word mappings or start fresh
-if os.path.exists(json_file):
-    with open(json_file, "r") as f:
-        word_map = json.load(f)
-else:
-    word_map = {}
+# Batches mapping updates and writes the JSON atomically under a file lock
+mapping_writer = MappingWriter(json_file)
+
+# Clips are stored once per content (media/<hash>.<ext>); the mapping points the word at it
+media_store = MediaStore(media_folder)
 
 # Function to download GIF or video if it doesn't exist
-def download_media(word):
+def download_media(word, session=None, commit=True):
+    """
+    Downloads the sign for one word and records it in word_to_media.json.
+    With commit=False the mapping update is only queued; call mapping_writer.flush() later.
+    """
     url = f"https://www.signasl.org/sign/{word}"
     headers = {"User-Agent": "Mozilla/5.0"}
+    http = session or requests
 
     try:
-        response = requests.get(url, headers=headers)
+        response = http.get(url, headers=headers)
         if response.status_code != 200:
             print(f"Failed to fetch {word}")
             return None
@@ -36,24 +42,38 @@ def download_media(word):
             if source:
                 media_url = source["src"]
                 file_extension = media_url.split('.')[-1]
-                media_file = f"{word}.{file_extension}"
-                media_path = os.path.join(media_folder, media_file)
 
-                # Download and save the media file
-                media_data = requests.get(media_url, headers=headers).content
-                with open(media_path, "wb") as f:
-                    f.write(media_data)
+                # Stored under its content hash: a clip already fetched for another word is not written again
+                media_data = http.get(media_url, headers=headers).content
+                media_file, stored = media_store.ingest_bytes(media_data, file_extension)
+                media_path = os.path.join(media_folder, media_file)
+                media_index.add(media_file)
 
                 # Update the JSON mapping
-                word_map[word] = media_file
-                with open(json_file, "w") as f:
-                    json.dump(word_map, f, indent=2)
+                mapping_writer.update(word, media_file)
+                if commit:
+                    mapping_writer.flush()
 
-                print(f"✅ Downloaded and mapped: {word} → {media_file}")
+                note = "" if stored else " (same clip as an existing sign)"
+                print(f"✅ Downloaded and mapped: {word} → {media_file}{note}")
                 return media_path
 
         print(f"❌ Media not found for: {word}")
     except Exception as e:
         print(f"❌ Error downloading {word}: {e}")
 
-    return None
\ No newline at end of file
+    return None
+
+def download_many(words, batch_size=50):
+    """
+    Bulk-seeds the media folder. Connections are pooled across downloads and the
+    mapping file is committed once per batch instead of once per word.
+    Returns {word: media_path or None}.
+    """
+    results = {}
+    with requests.Session() as session:
+        for start in range(0, len(words), batch_size):
+            for word in words[start:start + batch_size]:
+                results[word] = download_media(word, session=session, commit=False)
+            mapping_writer.flush()
+    return results
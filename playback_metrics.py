@@ -0,0 +1,73 @@
+import threading
+from collections import deque
+
+# Reports larger than this are truncated; one sentence rarely has more clips
+MAX_GAPS_PER_REPORT = 500
+# Samples over a minute come from a stalled or backgrounded tab, not a transition, and are dropped
+MAX_MS = 60000.0
+
+# --- 1. PLAYER METRICS ---
+
+class PlaybackMetrics:
+    """
+    Transition timings reported by the browser player (templates/index.html) after each
+    sequence: time from submit to the first sign, and the gap between one clip ending and
+    the next one starting. Keeps running totals plus the last `window` samples for percentiles.
+    """
+
+    def __init__(self, window=2000):
+        self._lock = threading.Lock()
+        self._gaps = deque(maxlen=window)
+        self._first_sign = deque(maxlen=window)
+        self.reports = 0
+        self.clips = 0
+        self.gap_count = 0
+        self.gap_total_ms = 0.0
+
+    @staticmethod
+    def _number(value):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return None
+        if not 0 <= value <= MAX_MS: # also rejects NaN
+            return None
+        return float(value)
+
+    def record(self, report):
+        """Adds one player report ({"first_sign_ms", "gaps_ms": [...], "clips"}). Returns False if malformed."""
+        if not isinstance(report, dict) or not isinstance(report.get("gaps_ms", []), list):
+            return False
+        gaps = [gap for gap in map(self._number, report.get("gaps_ms", [])[:MAX_GAPS_PER_REPORT]) if gap is not None]
+        first_sign = self._number(report.get("first_sign_ms"))
+        clips = report.get("clips")
+        clips = clips if isinstance(clips, int) and 0 <= clips <= MAX_GAPS_PER_REPORT + 1 else len(gaps) + 1
+
+        with self._lock:
+            self.reports += 1
+            self.clips += clips
+            self.gap_count += len(gaps)
+            self.gap_total_ms += sum(gaps)
+            self._gaps.extend(gaps)
+            if first_sign is not None:
+                self._first_sign.append(first_sign)
+        return True
+
+    @staticmethod
+    def _percentiles(samples):
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        def at(fraction):
+            return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))], 1)
+        return {"p50": at(0.5), "p95": at(0.95), "p99": at(0.99), "max": round(ordered[-1], 1)}
+
+    def summary(self):
+        with self._lock:
+            gaps = list(self._gaps)
+            first_sign = list(self._first_sign)
+            totals = {
+                "reports": self.reports,
+                "clips": self.clips,
+                "gaps": self.gap_count,
+                "mean_gap_ms": round(self.gap_total_ms / self.gap_count, 1) if self.gap_count else None,
+            }
+        return {**totals, "gap_ms": self._percentiles(gaps), "first_sign_ms": self._percentiles(first_sign)}
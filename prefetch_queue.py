@@ -0,0 +1,181 @@
+import sqlite3
+import threading
+import time
+
+# --- 1. PERSISTENT PREFETCH QUEUE ---
+
+class PrefetchQueue:
+    """
+    SQLite-backed job queue for acquiring sign clips in the background.
+    Unknown gloss words are enqueued while the request is answered with fingerspelling;
+    worker threads download the real sign so later requests pick it up from the media index.
+
+    Job states: pending -> running -> done | not_found
+    - Each word is one row, so enqueueing the same word twice is a no-op (deduplication).
+    - A failed attempt is retried after `retry_base_seconds * 2**attempts` (exponential backoff).
+    - After `max_attempts` the word is marked not_found and ignored for `negative_ttl_seconds`.
+    """
+
+    def __init__(self, acquire, db_path="prefetch_queue.sqlite3", workers=2, max_attempts=3,
+                 retry_base_seconds=30, negative_ttl_seconds=7 * 86400, on_success=None):
+        self.acquire = acquire
+        self.on_success = on_success
+        self.db_path = db_path
+        self.worker_count = max(1, int(workers))
+        self.max_attempts = max(1, int(max_attempts))
+        self.retry_base_seconds = float(retry_base_seconds)
+        self.negative_ttl_seconds = float(negative_ttl_seconds)
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._workers = []
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS prefetch_jobs ("
+            " word TEXT PRIMARY KEY, status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0,"
+            " next_attempt_at REAL NOT NULL, last_error TEXT, result TEXT, updated_at REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS prefetch_jobs_due ON prefetch_jobs (status, next_attempt_at)"
+        )
+        # Jobs left 'running' by a previous process never finished; make them eligible again
+        self._db.execute("UPDATE prefetch_jobs SET status = 'pending' WHERE status = 'running'")
+        self._db.commit()
+
+    def start(self):
+        """Starts the worker threads (idempotent)."""
+        with self._lock:
+            if self._workers:
+                return
+            for i in range(self.worker_count):
+                worker = threading.Thread(target=self._run, name=f"prefetch-{i}", daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def enqueue(self, word):
+        """Queues a word for acquisition unless it is already queued, done, or known to have no sign."""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT status, next_attempt_at FROM prefetch_jobs WHERE word = ?", (word,)
+            ).fetchone()
+            if row is None:
+                self._db.execute(
+                    "INSERT INTO prefetch_jobs (word, status, next_attempt_at, updated_at)"
+                    " VALUES (?, 'pending', ?, ?)",
+                    (word, now, now),
+                )
+            elif row[0] == "not_found" and row[1] <= now:
+                # Negative result expired: give the word another round of attempts
+                self._db.execute(
+                    "UPDATE prefetch_jobs SET status = 'pending', attempts = 0, next_attempt_at = ?,"
+                    " updated_at = ? WHERE word = ?",
+                    (now, now, word),
+                )
+            else:
+                return False
+            self._db.commit()
+        self._wakeup.set()
+        return True
+
+    def _claim(self):
+        """
+        Takes the next due job: (word, attempts), or None. Several processes (gunicorn workers)
+        can share the database, so the job is only taken by a conditional UPDATE that still
+        finds it pending and unchanged; if another worker got there first, the next job is tried.
+        """
+        while True:
+            now = time.time()
+            with self._lock:
+                row = self._db.execute(
+                    "SELECT word, attempts FROM prefetch_jobs WHERE status = 'pending' AND next_attempt_at <= ?"
+                    " ORDER BY next_attempt_at LIMIT 1",
+                    (now,),
+                ).fetchone()
+                if row is None:
+                    return None
+                with self._db: # one transaction, committed on exit
+                    claimed = self._db.execute(
+                        "UPDATE prefetch_jobs SET status = 'running', updated_at = ?"
+                        " WHERE word = ? AND status = 'pending' AND attempts = ? AND next_attempt_at <= ?",
+                        (now, row[0], row[1], now),
+                    ).rowcount
+            if claimed == 1:
+                return row
+
+    def _finish(self, word, attempts, result, error):
+        now = time.time()
+        with self._lock:
+            if result:
+                self._db.execute(
+                    "UPDATE prefetch_jobs SET status = 'done', attempts = ?, result = ?, last_error = NULL,"
+                    " updated_at = ? WHERE word = ?",
+                    (attempts, result, now, word),
+                )
+            elif attempts >= self.max_attempts:
+                self._db.execute(
+                    "UPDATE prefetch_jobs SET status = 'not_found', attempts = ?, next_attempt_at = ?,"
+                    " last_error = ?, updated_at = ? WHERE word = ?",
+                    (attempts, now + self.negative_ttl_seconds, error, now, word),
+                )
+            else:
+                self._db.execute(
+                    "UPDATE prefetch_jobs SET status = 'pending', attempts = ?, next_attempt_at = ?,"
+                    " last_error = ?, updated_at = ? WHERE word = ?",
+                    (attempts, now + self.retry_base_seconds * 2 ** attempts, error, now, word),
+                )
+            self._db.commit()
+
+    def _next_due_in(self):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT MIN(next_attempt_at) FROM prefetch_jobs WHERE status = 'pending'"
+            ).fetchone()
+        if row[0] is None:
+            return None
+        return max(0.0, row[0] - time.time())
+
+    def _run(self):
+        while True:
+            # Cleared before claiming so a word enqueued in between still wakes us
+            self._wakeup.clear()
+            job = self._claim()
+            if job is None:
+                # Sleep until the next retry is due or a new word arrives
+                self._wakeup.wait(timeout=self._next_due_in())
+                continue
+
+            word, attempts = job
+            result, error = None, None
+            try:
+                result = self.acquire(word)
+                if not result:
+                    error = "no sign found"
+            except Exception as e:
+                error = str(e)
+
+            self._finish(word, attempts + 1, result, error)
+            if result and self.on_success:
+                self.on_success(word, result)
+
+    def status(self, word=None):
+        """Job counts per state, or the full record for one word."""
+        with self._lock:
+            if word is not None:
+                row = self._db.execute(
+                    "SELECT word, status, attempts, next_attempt_at, last_error, result, updated_at"
+                    " FROM prefetch_jobs WHERE word = ?",
+                    (word,),
+                ).fetchone()
+                if row is None:
+                    return None
+                keys = ("word", "status", "attempts", "next_attempt_at", "last_error", "result", "updated_at")
+                return dict(zip(keys, row))
+
+            counts = dict(self._db.execute(
+                "SELECT status, COUNT(*) FROM prefetch_jobs GROUP BY status"
+            ).fetchall())
+        return {
+            "workers": len(self._workers),
+            "jobs": {state: counts.get(state, 0) for state in ("pending", "running", "done", "not_found")},
+        }
@@ -0,0 +1,113 @@
+import os
+import re
+import threading
+from functools import lru_cache
+
+# --- 1. SETTINGS ---
+
+COMMON_WORDS_FILE = os.getenv("ASL_COMMON_WORDS_FILE", "common_words.txt")
+
+# Words to filter out in the rule-based fallback (articles, prepositions, forms of 'to be', etc.)
+removable_words = frozenset({
+    'is', 'am', 'are', 'was', 'were', 'be', 'been', 'being',
+    'a', 'an', 'the', 'to', 'of', 'in', 'on', 'at', 'by',
+    'as', 'for', 'about', 'into', 'from', 'that',
+    'this', 'those', 'these', 'just', 'do', 'does', 'did',
+    'have', 'has', 'had', 'having', 'so', 'because',
+    'will', 'would', 'can', 'could', 'should', 'shall', 'may',
+    'might', 'must', 'and', 'or', 'but', 'if', 'than', 'then',
+    'i', 'me', 'you', 'he', 'she', 'it', 'we', 'us', 'they', 'them'
+})
+
+# Same punctuation stripping as before, compiled once
+_PUNCTUATION_RE = re.compile(r'[^\w\s]')
+
+# The only splits NLTK's word_tokenize still makes once punctuation is gone
+_SPLIT_WORDS = {
+    "cannot": ("can", "not"),
+    "gimme": ("gim", "me"),
+    "gonna": ("gon", "na"),
+    "gotta": ("got", "ta"),
+    "lemme": ("lem", "me"),
+    "wanna": ("wan", "na"),
+}
+
+# --- 2. LEMMATIZER (LAZY, MEMOIZED, WITH A PRECOMPUTED TABLE) ---
+
+lemmatizer = None
+lemma_table = {}
+_table_lock = threading.Lock()
+
+def load_lemmatizer():
+    """Imports NLTK and builds the WordNet lemmatizer on first use."""
+    global lemmatizer
+    if lemmatizer is None:
+        from nltk.stem import WordNetLemmatizer
+        lemmatizer = WordNetLemmatizer()
+    return lemmatizer
+
+@lru_cache(maxsize=65536)
+def lemmatize(word):
+    """Lemmatizes as a verb, then as a noun if that changed nothing. Results are memoized."""
+    lemmatizer = load_lemmatizer()
+    base_word = lemmatizer.lemmatize(word, pos='v')
+    if base_word == word:
+        base_word = lemmatizer.lemmatize(word)
+    return base_word
+
+def load_common_words(path=COMMON_WORDS_FILE):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return [
+                word.lower()
+                for line in f if not line.startswith("#")
+                for word in line.split()
+            ]
+    except OSError:
+        return []
+
+def build_lemma_table(vocabulary=()):
+    """
+    Precomputes lemmas for the media vocabulary plus the common word list, so the hot
+    path is one dict lookup per token. Unknown words fall back to the memoized lemmatizer.
+    """
+    global lemma_table
+    words = set(load_common_words()) | {word.lower() for word in vocabulary}
+    table = {word: lemmatize(word) for word in words if word not in removable_words}
+    with _table_lock:
+        lemma_table = table
+    return len(table)
+
+# --- 3. FAST RULE-BASED GLOSS ---
+
+def tokenize(text):
+    """Lowercases, strips punctuation and splits into words (matches NLTK word_tokenize here)."""
+    tokens = []
+    for word in _PUNCTUATION_RE.sub('', text).lower().split():
+        split = _SPLIT_WORDS.get(word)
+        if split:
+            tokens.extend(split)
+        else:
+            tokens.append(word)
+    return tokens
+
+def convert(text):
+    """Rule-based English → gloss: drop filler words, lemmatize, uppercase."""
+    table = lemma_table
+    glosses = []
+    for word in tokenize(text):
+        if word in removable_words:
+            continue
+        base_word = table.get(word)
+        if base_word is None:
+            base_word = lemmatize(word)
+        glosses.append(base_word.upper())
+    return ' '.join(glosses)
+
+def convert_many(texts):
+    """Batch API: converts many sentences; repeated sentences are converted once."""
+    converted = {}
+    for text in texts:
+        if text not in converted:
+            converted[text] = convert(text)
+    return [converted[text] for text in texts]
@@ -0,0 +1,143 @@
+import os
+import hashlib
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import Future
+
+from atomic_files import match_file_mode
+from media_index import media_index as default_media_index
+
+# --- 1. SETTINGS ---
+
+MEDIA_FOLDER = "media"
+SEQUENCE_FOLDER = os.path.join("media_cache", "sequences")
+FFMPEG_BIN = os.getenv("FFMPEG_BIN", "ffmpeg")
+
+# Every clip is normalized to one frame size/rate so clips from different sources can be joined
+SEQUENCE_WIDTH = 640
+SEQUENCE_HEIGHT = 360
+SEQUENCE_FPS = 30
+
+# Sequences being rendered, by output filename: concurrent requests share one ffmpeg run
+_render_lock = threading.Lock()
+_renders_in_flight = {}
+
+
+class SequenceRenderError(Exception):
+    """Raised when ffmpeg is unavailable or fails to join the clips."""
+
+# --- 2. RENDERING ---
+
+def sequence_key(media_files, media_index=default_media_index):
+    """
+    Cache key for an ordered list of media filenames, from each clip's name and content
+    fingerprint: a clip replaced in place gives its sequences new keys (and file names).
+    """
+    parts = (f"{media_file}:{media_index.fingerprint(media_file, verify=True)}" for media_file in media_files)
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()[:32]
+
+
+def _build_command(input_paths, output_path, frames=None):
+    command = [FFMPEG_BIN, "-hide_banner", "-loglevel", "error", "-y"]
+    for path in input_paths:
+        command += ["-i", path]
+
+    filters = []
+    for i in range(len(input_paths)):
+        # With `frames`, clip i is cut (or padded with its last frame) to exactly frames[i] frames
+        length = f",tpad=stop_mode=clone:stop=-1,trim=end_frame={frames[i]},setpts=PTS-STARTPTS" if frames else ""
+        filters.append(
+            f"[{i}:v]scale={SEQUENCE_WIDTH}:{SEQUENCE_HEIGHT}:force_original_aspect_ratio=decrease,"
+            f"pad={SEQUENCE_WIDTH}:{SEQUENCE_HEIGHT}:(ow-iw)/2:(oh-ih)/2,"
+            f"setsar=1,fps={SEQUENCE_FPS}{length},format=yuv420p[v{i}]"
+        )
+    joined = "".join(f"[v{i}]" for i in range(len(input_paths)))
+    filters.append(f"{joined}concat=n={len(input_paths)}:v=1:a=0[out]")
+
+    command += ["-filter_complex", ";".join(filters), "-map", "[out]", "-r", str(SEQUENCE_FPS)]
+    if frames:
+        # A keyframe at every clip start, so the player can seek straight to any clip
+        starts, position = [], 0
+        for count in frames:
+            starts.append(f"{position / SEQUENCE_FPS:.6f}")
+            position += count
+        command += ["-force_key_frames", ",".join(starts)]
+    command += [
+        "-c:v", "libx264", "-preset", "veryfast", "-crf", "26",
+        # moov atom up front so the browser can start playing while downloading
+        "-movflags", "+faststart",
+        "-f", "mp4",
+        output_path,
+    ]
+    return command
+
+
+def join_clips(media_files, output_path, frames=None):
+    """
+    Renders the given clips (filenames inside MEDIA_FOLDER, in order) into one MP4 at
+    output_path. `frames` optionally fixes each clip's length in frames (at SEQUENCE_FPS),
+    so the position of every clip in the output is known exactly.
+    """
+    input_paths = [os.path.join(MEDIA_FOLDER, media_file) for media_file in media_files]
+
+    # Render to a temp file and rename, so a half-written clip is never served
+    fd, temp_path = tempfile.mkstemp(suffix=".mp4", dir=os.path.dirname(output_path))
+    match_file_mode(fd) # ffmpeg overwrites the file in place, keeping mkstemp's 0600 otherwise
+    os.close(fd)
+    try:
+        result = subprocess.run(
+            _build_command(input_paths, temp_path, frames), capture_output=True, text=True, timeout=120
+        )
+        if result.returncode != 0:
+            raise SequenceRenderError(f"ffmpeg failed: {result.stderr.strip()[-500:]}")
+        os.replace(temp_path, output_path)
+    except FileNotFoundError:
+        raise SequenceRenderError(f"ffmpeg not found (looked for '{FFMPEG_BIN}'). Set FFMPEG_BIN.")
+    except subprocess.TimeoutExpired:
+        raise SequenceRenderError("ffmpeg timed out while joining clips.")
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def render_sequence(media_files, media_index=default_media_index):
+    """
+    Joins the given clips (filenames inside MEDIA_FOLDER, in order) into one MP4.
+    Results are cached on disk by sequence key, so a repeated sentence is served
+    straight from SEQUENCE_FOLDER; concurrent requests for a sequence that is still
+    rendering wait for that render instead of starting their own. Returns the output filename.
+    """
+    if not media_files:
+        raise SequenceRenderError("No clips to join.")
+
+    filename = f"{sequence_key(media_files, media_index)}.mp4"
+    output_path = os.path.join(SEQUENCE_FOLDER, filename)
+    if os.path.exists(output_path):
+        return filename
+
+    with _render_lock:
+        future = _renders_in_flight.get(filename)
+        leader = future is None
+        if leader:
+            future = Future()
+            _renders_in_flight[filename] = future
+
+    if not leader:
+        return future.result()
+
+    try:
+        # Another render of this sequence may have finished since the check above
+        if not os.path.exists(output_path):
+            os.makedirs(SEQUENCE_FOLDER, exist_ok=True)
+            join_clips(media_files, output_path)
+            print(f"✅ Rendered sequence of {len(media_files)} clips: {filename}")
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    else:
+        future.set_result(filename)
+        return filename
+    finally:
+        with _render_lock:
+            _renders_in_flight.pop(filename, None)
@@ -0,0 +1,88 @@
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def workdir(tmp_path_factory):
+    """
+    Runs the module in a throwaway working directory: the app's module-level singletons
+    (lexicon, media index, caches) use relative paths, so repo modules are imported in here.
+    """
+    workdir = tmp_path_factory.mktemp("app")
+    (workdir / "media").mkdir()
+    for name in ("word_to_media.json", "word_to_gif.json"):
+        (workdir / name).write_text("{}")
+
+    with pytest.MonkeyPatch.context() as patch:
+        patch.chdir(workdir)
+        for name, value in {"ASL_WARMUP": "0", "ASL_USE_AI": "0", "PREFETCH_ENABLED": "0"}.items():
+            patch.setenv(name, value)
+        yield workdir
+
+
+@pytest.fixture(scope="module")
+def app_module(workdir):
+    import app
+    return app
+
+
+def make_index(tmp_path, files, words=None, letters=None):
+    from lexicon import Lexicon
+    from media_index import MediaIndex
+
+    media = tmp_path / "media"
+    media.mkdir()
+    for name, data in files.items():
+        (media / name).write_bytes(data)
+    (tmp_path / "word_to_media.json").write_text(json.dumps(words or {}))
+    (tmp_path / "letter_to_media.json").write_text(json.dumps(letters or {}))
+    lexicon = Lexicon(str(tmp_path / "lexicon.sqlite3"), sources={str(tmp_path / "word_to_media.json"): ("ASL", 0)})
+    return MediaIndex(str(media), lexicon=lexicon, language="ASL", letter_map_file=str(tmp_path / "letter_to_media.json"))
+
+
+def test_clip_overwritten_in_place_gets_new_etag_and_version(app_module, tmp_path, monkeypatch):
+    index = make_index(tmp_path, {"hello.mp4": b"first clip"})
+    monkeypatch.setattr(app_module, "media_index", index)
+    monkeypatch.setattr(app_module, "MEDIA_FOLDER", index.media_folder)
+    client = app_module.app.test_client()
+
+    url = index.url_for("hello.mp4")
+    first = client.get(url)
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and "immutable" in first.headers["Cache-Control"]
+
+    # Rewrite the clip's bytes without creating or renaming anything: the folder's mtime stays put
+    folder_mtime = os.stat(index.media_folder).st_mtime_ns
+    with open(os.path.join(index.media_folder, "hello.mp4"), "r+b") as f:
+        f.write(b"replacement clip")
+    assert os.stat(index.media_folder).st_mtime_ns == folder_mtime
+    assert not index.refresh()
+
+    second = client.get(url, headers={"If-None-Match": etag})
+    assert second.status_code == 200
+    assert second.data == b"replacement clip"
+    assert second.headers["ETag"] != etag
+    assert "immutable" not in second.headers["Cache-Control"] # ?v= names the old content
+    assert index.url_for("hello.mp4") != url
+
+
+def test_word_entries_named_like_letters_are_not_fingerspelled(tmp_path):
+    # c.mp4 is the sign for CAT and "i" the pronoun: words, not the letters C and I
+    index = make_index(
+        tmp_path,
+        {"c.mp4": b"cat", "me.mp4": b"I, me", "A.mp4": b"letter A", "00000000000000bb.mp4": b"letter B"},
+        words={"i": "me.mp4", "C": "c.mp4"},
+        letters={"b": "00000000000000bb.mp4"},
+    )
+    assert index.media_for("c") == "c.mp4" and index.media_for("i") == "me.mp4"
+
+    assert index.letter_file("C") is None and index.letter_file("c") is None
+    assert index.letter_file("I") is None
+    assert index.letter_file("A") == "A.mp4"
+    assert index.letter_file("B") == "00000000000000bb.mp4"
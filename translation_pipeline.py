@@ -0,0 +1,154 @@
+import time
+
+from metrics import log_sampled
+
+# --- 1. PIPELINE ---
+
+class TranslationPipeline:
+    """
+    The single text → sign path used by /convert, /search_convert and /convert_batch:
+
+        normalize → gloss → resolve → fallback
+
+    stream() is a generator that yields (stage, payload) events as each stage finishes,
+    so callers can either collect the final result (run) or forward events as they come.
+    Every stage's own work time (not the time the consumer spends between events)
+    is reported to the registered timing hooks as hook(stage, seconds), and the tier of every
+    media event (exact, lemma, fingerspell, skipped, ...) to the tier hooks as hook(tier).
+    `describe(url)` (optional) returns per-clip metadata (duration, size, ...) sent with every URL.
+    `atlas(word)` (optional) returns the word's spelling as segments of one alphabet clip.
+    """
+
+    def __init__(self, gloss, gloss_many, media_index, resolver, fingerspell, on_missing=None, describe=None,
+                 atlas=None):
+        self.gloss = gloss
+        self.gloss_many = gloss_many
+        self.media_index = media_index
+        self.resolver = resolver
+        self.fingerspell = fingerspell
+        self.on_missing = on_missing
+        self.describe = describe
+        self.atlas = atlas
+        self.timing_hooks = []
+        self.tier_hooks = []
+
+    def add_timing_hook(self, hook):
+        self.timing_hooks.append(hook)
+
+    def add_tier_hook(self, hook):
+        self.tier_hooks.append(hook)
+
+    def _record(self, stage, seconds):
+        for hook in self.timing_hooks:
+            hook(stage, seconds)
+
+    def media_event(self, gloss, tier, urls):
+        """Payload of one "media" event: the span's clips, with their metadata when available."""
+        for hook in self.tier_hooks:
+            hook(tier)
+        event = {"gloss": gloss, "tier": tier, "urls": urls}
+        if self.describe:
+            event["clips"] = [self.describe(url) or {} for url in urls]
+        return event
+
+    def fingerspell_event(self, word):
+        """
+        "media" event spelling `word` letter by letter (tier "skipped" if it cannot be spelled).
+        With an atlas, it also carries "atlas": {"url", "segments"}, the same letters as
+        (start, end) offsets into one clip; "urls" keeps the per-letter clips for other clients.
+        """
+        urls = self.fingerspell(word)
+        event = self.media_event(word, "fingerspell" if urls else "skipped", urls)
+        if urls and self.atlas:
+            atlas = self.atlas(word)
+            if atlas:
+                event["atlas"] = atlas
+        return event
+
+    @staticmethod
+    def normalize(text):
+        return " ".join((text or "").split())
+
+    def stream(self, text=None, gloss=None):
+        """
+        Yields ("normalize", text), ("gloss", asl_text), ("resolve", spans), then one
+        ("media", {"gloss", "tier", "urls", "clips"}) per resolved span, in sentence order.
+        Pass `gloss` to skip the first two stages (already-glossed input).
+        """
+        if gloss is None:
+            started = time.perf_counter()
+            text = self.normalize(text)
+            self._record("normalize", time.perf_counter() - started)
+            yield "normalize", text
+
+            started = time.perf_counter()
+            gloss = self.gloss(text)
+            self._record("gloss", time.perf_counter() - started)
+            yield "gloss", gloss
+
+        started = time.perf_counter()
+        # One stat of the media folder per request; per-word lookups hit memory only
+        self.media_index.refresh()
+        spans = self.resolver.resolve(gloss.split())
+        self._record("resolve", time.perf_counter() - started)
+        yield "resolve", spans
+
+        fallback_seconds = 0.0
+        for span in spans:
+            started = time.perf_counter()
+            word = " ".join(span.tokens)
+            if span.media_file:
+                event = self.media_event(word, span.tier, [self.media_index.url_for(span.media_file)])
+            else:
+                # Fetch the real sign in the background for next time
+                if self.on_missing and word.isalpha():
+                    self.on_missing(word)
+
+                # --- FINGERSPELLING FALLBACK FOR SENTENCE WORDS (Optional) ---
+                event = self.fingerspell_event(word)
+                if not event["urls"]:
+                    log_sampled("sign_skipped", "Skipping sign: %s (No local video or fingerspelling letters found)", word)
+            fallback_seconds += time.perf_counter() - started
+            yield "media", event
+        self._record("fallback", fallback_seconds)
+
+    @staticmethod
+    def collect(events, gloss=""):
+        """
+        Folds stream() events into the JSON shape the routes return. With clip metadata,
+        "clips" lines up with "media" and "duration" is the total of the known clip lengths.
+        Fingerspelled spans spelled from the atlas carry it in their "resolution" entry.
+        """
+        result = {"asl_gloss": gloss, "media": [], "resolution": []}
+        for stage, payload in events:
+            if stage == "gloss":
+                result["asl_gloss"] = payload
+            elif stage == "media":
+                result["media"].extend(payload["urls"])
+                resolution = {"gloss": payload["gloss"], "tier": payload["tier"]}
+                if "atlas" in payload:
+                    resolution["atlas"] = payload["atlas"]
+                result["resolution"].append(resolution)
+                if "clips" in payload:
+                    result.setdefault("clips", []).extend(payload["clips"])
+        if "clips" in result:
+            result["duration"] = round(sum(clip.get("duration", 0) for clip in result["clips"]), 3)
+        return result
+
+    def run(self, text):
+        return self.collect(self.stream(text))
+
+    def run_gloss(self, gloss):
+        return self.collect(self.stream(gloss=gloss), gloss=gloss)
+
+    def run_many(self, texts):
+        """Translates several sentences; the gloss stage runs as one shared model batch."""
+        started = time.perf_counter()
+        normalized = [self.normalize(text) for text in texts]
+        self._record("normalize", time.perf_counter() - started)
+
+        started = time.perf_counter()
+        glosses = self.gloss_many(normalized)
+        self._record("gloss", time.perf_counter() - started)
+
+        return [self.run_gloss(gloss) for gloss in glosses]